@@ -5,7 +5,6 @@ import typing as t
 from abc import ABCMeta, abstractmethod
 from json import JSONDecodeError
 
-from jinja2 import Environment, FileSystemLoader
 from starlette.endpoints import HTTPEndpoint, Request
 from starlette.exceptions import HTTPException
 from starlette.responses import (
@@ -15,8 +14,10 @@ from starlette.responses import (
 )
 from starlette.status import HTTP_303_SEE_OTHER
 
+from piccolo_api.session_auth.cache import evict_cached_sessions
 from piccolo_api.session_auth.tables import SessionsBase
 from piccolo_api.shared.auth.styles import Styles
+from piccolo_api.shared.templates import get_template
 
 if t.TYPE_CHECKING:  # pragma: no cover
     from jinja2 import Template
@@ -190,6 +191,7 @@ class ChangePasswordEndpoint(HTTPEndpoint, metaclass=ABCMeta):
             await session_table.delete().where(
                 session_table.user_id == piccolo_user.id
             )
+            evict_cached_sessions(user_id=piccolo_user.id)
 
         response = RedirectResponse(
             url=self._login_url, status_code=HTTP_303_SEE_OTHER
@@ -240,11 +242,7 @@ def change_password(
         else template_path
     )
 
-    directory, filename = os.path.split(template_path)
-    environment = Environment(
-        loader=FileSystemLoader(directory), autoescape=True
-    )
-    change_password_template = environment.get_template(filename)
+    change_password_template = get_template(template_path)
 
     class _ChangePasswordEndpoint(ChangePasswordEndpoint):
         _login_url = login_url
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import hmac
+import http.cookies
+import re
+import secrets
 import typing as t
-import uuid
 from collections.abc import Sequence
+from functools import wraps
 
-from starlette.datastructures import URL
-from starlette.middleware.base import (
-    BaseHTTPMiddleware,
-    Request,
-    RequestResponseEndpoint,
-)
+from starlette.datastructures import URL, MutableHeaders
+from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 SAFE_HTTP_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
 ONE_YEAR = 31536000  # 365 * 24 * 60 * 60
@@ -19,7 +21,17 @@ DEFAULT_COOKIE_NAME = "csrftoken"
 DEFAULT_HEADER_NAME = "X-CSRFToken"
 
 
-class CSRFMiddleware(BaseHTTPMiddleware):
+def tokens_match(a: t.Any, b: t.Any) -> bool:
+    """
+    Compares the tokens in constant time, so the comparison doesn't leak how
+    much of the token was correct.
+    """
+    if not (isinstance(a, str) and isinstance(b, str)):
+        return False
+    return hmac.compare_digest(a.encode(), b.encode())
+
+
+class CSRFMiddleware:
     """
     For GET requests, set a random token as a cookie. For unsafe HTTP methods,
     require a HTTP header to match the cookie value, otherwise the request
@@ -37,7 +49,7 @@ class CSRFMiddleware(BaseHTTPMiddleware):
 
     @staticmethod
     def get_new_token() -> str:
-        return str(uuid.uuid4())
+        return secrets.token_urlsafe(nbytes=24)
 
     def __init__(
         self,
@@ -71,6 +83,9 @@ class CSRFMiddleware(BaseHTTPMiddleware):
             Whether to look for the CSRF token in a form field with the same
             name as the cookie. By default, it's not enabled.
 
+        Any other keyword arguments are ignored - they're accepted for
+        backwards compatibility, from when this was a ``BaseHTTPMiddleware``.
+
         """
         if not isinstance(allowed_hosts, Sequence):
             raise ValueError(
@@ -79,11 +94,14 @@ class CSRFMiddleware(BaseHTTPMiddleware):
 
         self.allowed_hosts = allowed_hosts
         self.cookie_name = cookie_name
+        self._cookie_regex = re.compile(
+            r"(?:^|;)\s*" + re.escape(cookie_name) + r"=([^;]*)"
+        )
         self.header_name = header_name
         self.max_age = max_age
         self.allow_header_param = allow_header_param
         self.allow_form_param = allow_form_param
-        super().__init__(app, **kwargs)
+        self.app = app
 
     def is_valid_referer(self, request: Request) -> bool:
         header: str = (
@@ -97,83 +115,170 @@ class CSRFMiddleware(BaseHTTPMiddleware):
         is_valid = hostname in self.allowed_hosts if hostname else False
         return is_valid
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ):
+    def get_cookie_token(self, request: Request) -> t.Optional[str]:
+        """
+        Extracts the CSRF token from the ``Cookie`` header. This is quicker
+        than ``request.cookies``, which parses every cookie, when we only need
+        one of them.
+        """
+        cookie_header = request.headers.get("cookie")
+        if not cookie_header:
+            return None
+
+        # If the cookie is repeated, the last value wins, as with
+        # ``request.cookies``.
+        matches = self._cookie_regex.findall(cookie_header)
+        return matches[-1].strip() if matches else None
+
+    def get_cookie_header(self, token: str) -> str:
+        """
+        The ``Set-Cookie`` header value for a new token - the same as
+        ``Response.set_cookie`` would produce.
+        """
+        cookie: http.cookies.BaseCookie = http.cookies.SimpleCookie()
+        cookie[self.cookie_name] = token
+        cookie[self.cookie_name]["max-age"] = self.max_age
+        cookie[self.cookie_name]["path"] = "/"
+        cookie[self.cookie_name]["samesite"] = "lax"
+        return cookie.output(header="").strip()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        This is a pure ASGI middleware, rather than a ``BaseHTTPMiddleware``,
+        so the response isn't streamed through a separate task.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+
         if request.method in SAFE_HTTP_METHODS:
-            token = request.cookies.get(self.cookie_name, None)
+            token = self.get_cookie_token(request)
             token_required = token is None
 
             if token_required:
                 token = self.get_new_token()
 
-            request.scope.update(
+            scope.update(
                 {
                     "csrftoken": token,
                     "csrf_cookie_name": self.cookie_name,
                 }
             )
-            response = await call_next(request)
 
-            if token_required and token:
-                response.set_cookie(
-                    self.cookie_name,
-                    token,
-                    max_age=self.max_age,
-                )
-            return response
+            if not token_required:
+                await self.app(scope, receive, send)
+                return
+
+            cookie_header = self.get_cookie_header(t.cast(str, token))
+
+            @wraps(send)
+            async def wrapped_send(message: Message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("set-cookie", cookie_header)
+
+                await send(message)
+
+            await self.app(scope, receive, wrapped_send)
+            return
+
+        cookie_token = self.get_cookie_token(request)
+
+        response = await self.check_request(request, cookie_token)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        scope.update(
+            {
+                "csrftoken": cookie_token,
+                "csrf_cookie_name": self.cookie_name,
+            }
+        )
+
+        if "form" in scope:
+            # The body has already been consumed, so replay it for the app.
+            body = await request.body()
+            body_sent = False
+
+            async def replay_receive() -> Message:
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {
+                        "type": "http.request",
+                        "body": body,
+                        "more_body": False,
+                    }
+                return await receive()
+
+            await self.app(scope, replay_receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def check_request(
+        self, request: Request, cookie_token: t.Optional[str]
+    ) -> t.Optional[Response]:
+        """
+        Checks the CSRF token for requests with an unsafe HTTP method.
+
+        :param cookie_token:
+            The CSRF token from the cookie, if present.
+
+        :returns:
+            A ``Response`` if the request should be rejected, otherwise
+            ``None``.
+
+        """
+        if not cookie_token:
+            return Response("No CSRF cookie found", status_code=403)
+
+        header_token = (
+            request.headers.get(self.header_name)
+            if self.allow_header_param
+            else None
+        )
+
+        if self.allow_form_param and not header_token:
+            # Read the body first, so it's cached, and can be replayed for the
+            # app once the form has been parsed.
+            await request.body()
+            form_data = await request.form()
+            form_token = form_data.get(self.cookie_name, None)
+            request.scope.update({"form": form_data})
         else:
-            cookie_token = request.cookies.get(self.cookie_name)
-            if not cookie_token:
-                return Response("No CSRF cookie found", status_code=403)
-
-            header_token = (
-                request.headers.get(self.header_name)
-                if self.allow_header_param
-                else None
-            )
+            form_token = None
 
-            if self.allow_form_param and not header_token:
-                form_data = await request.form()
-                form_token = form_data.get(self.cookie_name, None)
-                request.scope.update({"form": form_data})
-            else:
-                form_token = None
+        if not header_token and not form_token:
+            return Response(
+                "The CSRF token wasn't found in the form data or header.",
+                status_code=403,
+            )
 
-            if not header_token and not form_token:
-                return Response(
-                    "The CSRF token wasn't found in the form data or header.",
-                    status_code=403,
-                )
+        if header_token and not tokens_match(cookie_token, header_token):
+            return Response(
+                "The CSRF token in the header doesn't match the cookie.",
+                status_code=403,
+            )
 
-            if header_token and (cookie_token != header_token):
-                return Response(
-                    "The CSRF token in the header doesn't match the cookie.",
-                    status_code=403,
-                )
+        if form_token and not tokens_match(cookie_token, form_token):
+            return Response(
+                "The CSRF token in the form doesn't match the cookie.",
+                status_code=403,
+            )
 
-            if form_token and (cookie_token != form_token):
+        # Provides defence in depth:
+        if request.base_url.is_secure:
+            # According to this paper, the referer header is present in
+            # the vast majority of HTTPS requests, but not HTTP requests,
+            # so only check it for HTTPS.
+            # https://seclab.stanford.edu/websec/csrf/csrf.pdf
+            if not self.is_valid_referer(request):
                 return Response(
-                    "The CSRF token in the form doesn't match the cookie.",
-                    status_code=403,
+                    "Referer or origin is incorrect", status_code=403
                 )
 
-            # Provides defence in depth:
-            if request.base_url.is_secure:
-                # According to this paper, the referer header is present in
-                # the vast majority of HTTPS requests, but not HTTP requests,
-                # so only check it for HTTPS.
-                # https://seclab.stanford.edu/websec/csrf/csrf.pdf
-                if not self.is_valid_referer(request):
-                    return Response(
-                        "Referer or origin is incorrect", status_code=403
-                    )
-
-            request.scope.update(
-                {
-                    "csrftoken": cookie_token,
-                    "csrf_cookie_name": self.cookie_name,
-                }
-            )
-
-            return await call_next(request)
+        return None
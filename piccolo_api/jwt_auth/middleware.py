@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import enum
+import hashlib
 import typing as t
+from time import time
 
 import jwt
 from piccolo.apps.user.tables import BaseUser
@@ -74,6 +76,8 @@ class JWTMiddleware:
         auth_table: t.Type[BaseUser] = BaseUser,
         blacklist: JWTBlacklist = JWTBlacklist(),
         allow_unauthenticated: bool = False,
+        token_cache_ttl: float = 30,
+        token_cache_size: int = 10000,
     ) -> None:
         """
         :param asgi:
@@ -89,6 +93,13 @@ class JWTMiddleware:
         :param allow_unauthenticated:
             By default the middleware rejects any requests with an invalid
             token.
+        :param token_cache_ttl:
+            Once a token has been verified, its payload is cached for this
+            many seconds (or until the token expires, if sooner), so clients
+            reusing the same token don't pay for verification on every
+            request. Set to ``0`` to disable the cache.
+        :param token_cache_size:
+            The maximum number of tokens to keep in the cache.
 
         """
         self.asgi = asgi
@@ -96,6 +107,14 @@ class JWTMiddleware:
         self.auth_table = auth_table
         self.blacklist = blacklist
         self.allow_unauthenticated = allow_unauthenticated
+        self.token_cache_ttl = token_cache_ttl
+        self.token_cache_size = token_cache_size
+
+        # Maps a hash of the token to when the cache entry expires, and the
+        # decoded payload.
+        self._token_cache: t.Dict[
+            bytes, t.Tuple[float, t.Dict[str, t.Any]]
+        ] = {}
 
     def get_token(self, headers: dict) -> t.Optional[str]:
         """
@@ -107,7 +126,49 @@ class JWTMiddleware:
         auth_str = auth_token.decode()
         if not auth_str.startswith("Bearer "):
             return None
-        return auth_str.split(" ")[1]
+        token = auth_str.split(" ")[1]
+        # A JWT always has three segments - reject anything else early,
+        # without trying to decode it.
+        if token.count(".") != 2:
+            return None
+        return token
+
+    def decode_token(self, token: str) -> t.Dict[str, t.Any]:
+        """
+        Verify the token, and return its payload. Payloads are cached, so
+        repeat requests with the same token skip verification.
+
+        :raises jwt.exceptions.InvalidTokenError:
+            If the token can't be verified.
+
+        """
+        if not self.token_cache_ttl:
+            return jwt.decode(token, self.secret, algorithms=["HS256"])
+
+        now = time()
+        key = hashlib.sha256(token.encode()).digest()
+
+        cached = self._token_cache.get(key)
+        if cached is not None:
+            expires_at, token_dict = cached
+            if now < expires_at:
+                return token_dict
+            del self._token_cache[key]
+
+        token_dict = jwt.decode(token, self.secret, algorithms=["HS256"])
+
+        expires_at = now + self.token_cache_ttl
+        exp = token_dict.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+
+        if len(self._token_cache) >= self.token_cache_size:
+            # Evict the oldest entry - dicts preserve insertion order.
+            del self._token_cache[next(iter(self._token_cache))]
+
+        self._token_cache[key] = (expires_at, token_dict)
+
+        return token_dict
 
     async def get_user(
         self, token_dict: t.Dict[str, t.Any]
@@ -164,7 +225,7 @@ class JWTMiddleware:
                 )
 
         try:
-            token_dict = jwt.decode(token, self.secret, algorithms=["HS256"])
+            token_dict = self.decode_token(token)
         except jwt.exceptions.ExpiredSignatureError:
             error = JWTError.token_expired.value
             if allow_unauthenticated:
@@ -179,7 +240,10 @@ class JWTMiddleware:
                     status_code=HTTP_401_UNAUTHORIZED,
                     detail=error,
                 )
-        except jwt.exceptions.InvalidSignatureError:
+        except jwt.exceptions.InvalidTokenError:
+            # The token is only decoded once, and verified as part of that -
+            # any failure other than expiry means the token can't be trusted
+            # (a bad signature, a malformed token etc).
             error = JWTError.token_invalid.value
             if allow_unauthenticated:
                 await self.asgi(
@@ -300,7 +300,7 @@ class S3MediaStorage(MediaStorage):
         while True:
             batch = file_keys[
                 (iteration * batch_size) : (  # noqa: E203
-                    iteration + 1 * batch_size
+                    (iteration + 1) * batch_size
                 )
             ]
             if not batch:
@@ -314,7 +314,7 @@ class S3MediaStorage(MediaStorage):
                         {
                             "Key": self._prepend_folder_name(file_key),
                         }
-                        for file_key in file_keys
+                        for file_key in batch
                     ],
                 },
             )
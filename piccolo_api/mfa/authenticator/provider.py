@@ -1,7 +1,6 @@
 import os
 import typing as t
 
-from jinja2 import Environment, FileSystemLoader
 from piccolo.apps.user.tables import BaseUser
 
 from piccolo_api.encryption.providers import EncryptionProvider
@@ -9,6 +8,7 @@ from piccolo_api.mfa.authenticator.tables import AuthenticatorSecret
 from piccolo_api.mfa.authenticator.utils import get_b64encoded_qr_image
 from piccolo_api.mfa.provider import MFAProvider
 from piccolo_api.shared.auth.styles import Styles
+from piccolo_api.shared.templates import get_template
 
 MFA_SETUP_TEMPLATE_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
@@ -73,11 +73,7 @@ class AuthenticatorProvider(MFAProvider):
         register_template_path = (
             register_template_path or MFA_SETUP_TEMPLATE_PATH
         )
-        directory, filename = os.path.split(register_template_path)
-        environment = Environment(
-            loader=FileSystemLoader(directory), autoescape=True
-        )
-        self.register_template = environment.get_template(filename)
+        self.register_template = get_template(register_template_path)
 
     async def authenticate_user(self, user: BaseUser, code: str) -> bool:
         """
@@ -9,7 +9,7 @@ from piccolo.columns import Array, Integer, Serial, Text, Timestamptz
 from piccolo.table import Table
 
 from piccolo_api.encryption.providers import EncryptionProvider
-from piccolo_api.mfa.recovery_codes import generate_recovery_code
+from piccolo_api.mfa.recovery_codes import generate_recovery_codes
 
 if t.TYPE_CHECKING:  # pragma: no cover
     import pyotp
@@ -90,9 +90,7 @@ class AuthenticatorSecret(Table):
         """
         # Generate recovery codes
 
-        recovery_codes = [
-            generate_recovery_code() for _ in range(recovery_code_count)
-        ]
+        recovery_codes = generate_recovery_codes(count=recovery_code_count)
 
         #######################################################################
         # Hash the recovery codes
@@ -6,15 +6,81 @@ import typing as t
 DEFAULT_CHARACTERS = string.ascii_lowercase + string.digits
 
 
-def _get_random_string(length: int, characters: t.Sequence[str]) -> str:
+def _get_random_strings(
+    count: int, length: int, characters: t.Sequence[str]
+) -> t.List[str]:
     """
+    :param count:
+        How many strings to generate.
     :param length:
-        How long to make the string.
+        How long to make each string.
     :param characters:
         Which characters to randomly pick from.
 
     """
-    return "".join(secrets.choice(characters) for _ in range(length))
+    character_count = len(characters)
+
+    if character_count > 256:
+        return [
+            "".join(secrets.choice(characters) for _ in range(length))
+            for _ in range(count)
+        ]
+
+    # Rather than calling ``secrets.choice`` for each character (which reads
+    # from the OS random source each time), we fetch the random bytes for all
+    # of the strings in one go. To avoid modulo bias, bytes above the largest
+    # multiple of ``character_count`` are discarded.
+    limit = 256 - (256 % character_count)
+    total_length = count * length
+    chosen: t.List[str] = []
+
+    while len(chosen) < total_length:
+        chosen.extend(
+            characters[byte % character_count]
+            for byte in secrets.token_bytes(total_length)
+            if byte < limit
+        )
+
+    return [
+        "".join(chosen[i : i + length])  # noqa: E203
+        for i in range(0, total_length, length)
+    ]
+
+
+def generate_recovery_codes(
+    count: int,
+    length: int = 12,
+    characters: t.Sequence[str] = DEFAULT_CHARACTERS,
+    separator: str = "-",
+) -> t.List[str]:
+    """
+    Generates several recovery codes at once - this is more efficient than
+    calling :func:`generate_recovery_code` repeatedly.
+
+    :param count:
+        How many recovery codes to generate.
+
+    See :func:`generate_recovery_code` for the other arguments.
+
+    """
+    if length < 10:
+        raise ValueError("The length must be at least 10.")
+
+    random_strings = _get_random_strings(
+        count=count, length=length, characters=characters
+    )
+
+    if separator:
+        split_at = math.ceil(length / 2)
+
+        return [
+            separator.join(
+                [random_string[:split_at], random_string[split_at:]]
+            )
+            for random_string in random_strings
+        ]
+
+    return random_strings
 
 
 def generate_recovery_code(
@@ -37,16 +103,6 @@ def generate_recovery_code(
         string if you want to disable this behaviour.
 
     """
-    if length < 10:
-        raise ValueError("The length must be at least 10.")
-
-    random_string = _get_random_string(length=length, characters=characters)
-
-    if separator:
-        split_at = math.ceil(length / 2)
-
-        return separator.join(
-            [random_string[:split_at], random_string[split_at:]]
-        )
-
-    return random_string
+    return generate_recovery_codes(
+        count=1, length=length, characters=characters, separator=separator
+    )[0]
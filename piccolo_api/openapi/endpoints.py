@@ -27,6 +27,8 @@ def swagger_ui(
     csrf_cookie_name: t.Optional[str] = DEFAULT_COOKIE_NAME,
     csrf_header_name: t.Optional[str] = DEFAULT_HEADER_NAME,
     swagger_ui_version: str = "5",
+    swagger_js_url: t.Optional[str] = None,
+    swagger_css_url: t.Optional[str] = None,
 ):
     """
     Even though ASGI frameworks such as FastAPI and BlackSheep have endpoints
@@ -56,23 +58,43 @@ def swagger_ui(
         The HTTP header name which the CSRF cookie value will be added to.
     :param swagger_ui_version:
         Which version of Swagger UI to use.
+    :param swagger_js_url:
+        By default, the Swagger UI JavaScript is loaded from a CDN. If you'd
+        rather serve it yourself (for example, using Starlette's
+        ``StaticFiles``), pass in its URL here.
+    :param swagger_css_url:
+        Like ``swagger_js_url``, but for the Swagger UI CSS.
 
     """
+    if swagger_js_url is None:
+        swagger_js_url = (
+            "https://cdn.jsdelivr.net/npm/"
+            f"swagger-ui-dist@{swagger_ui_version}/swagger-ui-bundle.js"
+        )
+
+    if swagger_css_url is None:
+        swagger_css_url = (
+            "https://cdn.jsdelivr.net/npm/"
+            f"swagger-ui-dist@{swagger_ui_version}/swagger-ui.css"
+        )
 
     # We return a router, because it's effectively a mini ASGI
     # app, which can be mounted in any ASGI app which supports mounting.
     router = Router()
 
+    # The HTML doesn't depend on the request, so we only render it once.
+    template = ENVIRONMENT.get_template("swagger_ui.html.jinja")
+    html = template.render(
+        schema_url=schema_url,
+        swagger_ui_title=swagger_ui_title,
+        csrf_cookie_name=csrf_cookie_name,
+        csrf_header_name=csrf_header_name,
+        swagger_js_url=swagger_js_url,
+        swagger_css_url=swagger_css_url,
+    ).encode()
+
     class DocsEndpoint(HTTPEndpoint):
         def get(self, request: Request):
-            template = ENVIRONMENT.get_template("swagger_ui.html.jinja")
-            html = template.render(
-                schema_url=schema_url,
-                swagger_ui_title=swagger_ui_title,
-                csrf_cookie_name=csrf_cookie_name,
-                csrf_header_name=csrf_header_name,
-                swagger_ui_version=swagger_ui_version,
-            )
             return HTMLResponse(content=html)
 
     class OAuthRedirectEndpoint(HTTPEndpoint):
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import array
 import typing as t
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
-from time import time
+from time import monotonic
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
@@ -69,10 +70,10 @@ class InMemoryLimitProvider(RateLimitProvider):
         self.request_dict: defaultdict = defaultdict(int)
 
         self.timespan = timespan
-        self.last_reset = time()
+        self.last_reset = monotonic()
         self.limit = limit
 
-        self.blocked: t.Dict[str, float] = {}
+        self.blocked: t.Dict[t.Hashable, float] = {}
         self.block_duration = block_duration
 
     def _handle_blocked(self):
@@ -83,19 +84,22 @@ class InMemoryLimitProvider(RateLimitProvider):
         Check whether the identifier is already blocked from previous
         requests. Remove the identifier if the block has expired.
         """
-        blocked_at: t.Optional[float] = self.blocked.get(identifier, None)
+        return self._is_blocked(identifier)
+
+    def _is_blocked(self, key: t.Hashable) -> bool:
+        blocked_at: t.Optional[float] = self.blocked.get(key, None)
         if blocked_at:
             duration = self.block_duration
-            if (time() - blocked_at < duration) if duration else True:
+            if (monotonic() - blocked_at < duration) if duration else True:
                 return True
             else:
-                del self.blocked[identifier]
+                del self.blocked[key]
                 return False
         else:
             return False
 
     def add_to_blocked(self, identifier: str):
-        self.blocked[identifier] = time()
+        self.blocked[identifier] = monotonic()
 
     def increment(self, identifier: str):
         """
@@ -112,10 +116,10 @@ class InMemoryLimitProvider(RateLimitProvider):
             self._handle_blocked()
 
         # Reset the request count if needed.
-        now = time()
+        now = monotonic()
         if now - self.last_reset > self.timespan:
             self.last_reset = now
-            self.request_dict = defaultdict(int)
+            self.request_dict.clear()
 
         self.request_dict[identifier] += 1
 
@@ -130,6 +134,79 @@ class InMemoryLimitProvider(RateLimitProvider):
         self.blocked = {}
 
 
+class BucketedInMemoryLimitProvider(InMemoryLimitProvider):
+    """
+    Like :class:`InMemoryLimitProvider`, but rather than storing a count for
+    each client, the identifiers are hashed into a fixed number of buckets.
+    Blocks are also recorded per bucket, so the memory used is fixed, no
+    matter how many clients make requests.
+
+    The trade-off is that clients whose identifiers hash to the same bucket
+    share a count, so may be rate limited slightly sooner than expected, and
+    are blocked together.
+    """
+
+    def __init__(
+        self,
+        timespan: int,
+        limit: int = 1000,
+        block_duration: t.Optional[int] = None,
+        bucket_count: int = 65536,
+    ):
+        """
+        :param bucket_count:
+            The number of buckets to hash identifiers into - must be a power
+            of two. The more buckets, the less likely it is that two clients
+            share one, but the more memory is used (4 bytes per bucket).
+
+        See :class:`InMemoryLimitProvider` for the other arguments.
+
+        """
+        if bucket_count < 1 or bucket_count & (bucket_count - 1):
+            raise ValueError("bucket_count must be a power of two.")
+
+        super().__init__(
+            timespan=timespan, limit=limit, block_duration=block_duration
+        )
+
+        self.bucket_count = bucket_count
+        self._mask = bucket_count - 1
+        self.buckets = self._new_buckets()
+
+    def _new_buckets(self) -> array.array:
+        return array.array("I", bytes(4 * self.bucket_count))
+
+    def _get_bucket(self, identifier: str) -> int:
+        return hash(identifier) & self._mask
+
+    def is_already_blocked(self, identifier: str) -> bool:
+        return self._is_blocked(self._get_bucket(identifier))
+
+    def add_to_blocked(self, identifier: str):
+        self.blocked[self._get_bucket(identifier)] = monotonic()
+
+    def increment(self, identifier: str):
+        index = self._get_bucket(identifier)
+
+        if self._is_blocked(index):
+            self._handle_blocked()
+
+        # Reset the request count if needed.
+        now = monotonic()
+        if now - self.last_reset > self.timespan:
+            self.last_reset = now
+            self.buckets = self._new_buckets()
+
+        count = self.buckets[index] + 1
+
+        if count > self.limit:
+            # We don't store the new count, so the bucket can't overflow.
+            self.blocked[index] = now
+            self._handle_blocked()
+
+        self.buckets[index] = count
+
+
 class RateLimitingMiddleware(BaseHTTPMiddleware):
     """
     Blocks clients who exceed a given number of requests in a given time
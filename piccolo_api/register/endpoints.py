@@ -6,7 +6,6 @@ import typing as t
 from abc import ABCMeta, abstractmethod
 from json import JSONDecodeError
 
-from jinja2 import Environment, FileSystemLoader
 from piccolo.apps.user.tables import BaseUser
 from starlette.datastructures import URL
 from starlette.endpoints import HTTPEndpoint, Request
@@ -19,6 +18,7 @@ from starlette.responses import (
 from starlette.status import HTTP_303_SEE_OTHER
 
 from piccolo_api.shared.auth.styles import Styles
+from piccolo_api.shared.templates import get_template
 
 if t.TYPE_CHECKING:  # pragma: no cover
     from jinja2 import Template
@@ -254,11 +254,7 @@ def register(
         SIGNUP_TEMPLATE_PATH if template_path is None else template_path
     )
 
-    directory, filename = os.path.split(template_path)
-    environment = Environment(
-        loader=FileSystemLoader(directory), autoescape=True
-    )
-    register_template = environment.get_template(filename)
+    register_template = get_template(template_path)
 
     class _RegisterEndpoint(RegisterEndpoint):
         _auth_table = auth_table or BaseUser
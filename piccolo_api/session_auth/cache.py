@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import typing as t
+import weakref
+from datetime import datetime
+from time import monotonic
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from piccolo.apps.user.tables import BaseUser
+
+
+# Every ``SessionCache`` which has been created, so stale entries can be
+# evicted from all of them when a session is removed.
+_CACHES: weakref.WeakSet[SessionCache] = weakref.WeakSet()
+
+
+class SessionCache:
+    """
+    Caches the user for each session token in memory, for a limited time.
+    Used by ``SessionsAuthBackend`` when ``session_cache_ttl`` is set.
+    """
+
+    def __init__(self, ttl: float, size: int = 10000):
+        """
+        :param ttl:
+            How many seconds to cache each session for.
+        :param size:
+            The maximum number of sessions to keep in the cache. Once full,
+            the oldest entry is evicted.
+
+        """
+        self.ttl = ttl
+        self.size = size
+
+        # Maps the session token to when the cache entry expires, and the
+        # matching user.
+        self._cache: t.Dict[str, t.Tuple[float, BaseUser]] = {}
+
+        _CACHES.add(self)
+
+    def get(self, token: str) -> t.Optional[BaseUser]:
+        cached = self._cache.get(token)
+        if cached is None:
+            return None
+
+        expires_at, user = cached
+        if monotonic() < expires_at:
+            return user
+
+        self._cache.pop(token, None)
+        return None
+
+    def set(
+        self,
+        token: str,
+        user: BaseUser,
+        session_expiry: t.Optional[datetime] = None,
+    ) -> None:
+        """
+        :param session_expiry:
+            When the session itself expires. The entry is never cached beyond
+            this, even if it's sooner than the ``ttl``.
+
+        """
+        ttl = self.ttl
+        if session_expiry is not None:
+            ttl = min(ttl, (session_expiry - datetime.now()).total_seconds())
+            if ttl <= 0:
+                return
+
+        if len(self._cache) >= self.size:
+            # Evict the oldest entry - dicts preserve insertion order.
+            self._cache.pop(next(iter(self._cache)), None)
+
+        self._cache[token] = (monotonic() + ttl, user)
+
+    def evict(
+        self, token: t.Optional[str] = None, user_id: t.Optional[int] = None
+    ) -> None:
+        """
+        Removes the entry for the given session token, and / or any entries
+        for the given user.
+        """
+        if token is not None:
+            self._cache.pop(token, None)
+
+        if user_id is not None:
+            for key, (_, user) in list(self._cache.items()):
+                if getattr(user, user._meta.primary_key._meta.name) == user_id:
+                    self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def evict_cached_sessions(
+    token: t.Optional[str] = None, user_id: t.Optional[int] = None
+) -> None:
+    """
+    Removes matching entries from every session cache in the current
+    process. Caches in other processes (for example, other workers) aren't
+    affected, so their entries remain until they expire, after at most
+    ``session_cache_ttl`` seconds.
+
+    This is done automatically when a session is removed using
+    :meth:`SessionsBase.remove_session <piccolo_api.session_auth.tables.SessionsBase.remove_session>`
+    (for example, when logging out), and when a user changes their password.
+    If your app changes a user in some other way which affects whether they
+    can log in (for example, making them inactive), call this with their
+    ``user_id``.
+
+    :param token:
+        Evict the entry for this session token.
+    :param user_id:
+        Evict all entries for this user.
+
+    """  # noqa: E501
+    for cache in list(_CACHES):
+        cache.evict(token=token, user_id=user_id)
@@ -1,13 +1,41 @@
 from datetime import datetime
 
+from piccolo.utils.sync import run_sync
+
 from .tables import SessionsBase
 
 
-async def clean():
+async def clean(batch_size: int = 1000):
     """
     Removes any sessions from the table which have expired.
+
+    :param batch_size:
+        The sessions are deleted in batches of this size, so a large number of
+        expired sessions doesn't result in a single long running query.
+
     """
     print("Removing old sessions ...")
     now = datetime.now()
-    await SessionsBase.delete().where(SessionsBase.expiry_date < now).run()
+
+    primary_key = SessionsBase._meta.primary_key
+    expired = SessionsBase.expiry_date < now
+
+    # The ids are selected using a subquery, rather than being passed as
+    # parameters, as older versions of SQLite only allow 999 parameters.
+    while await SessionsBase.exists().where(expired).run():
+        await SessionsBase.delete().where(
+            primary_key.is_in(
+                SessionsBase.select(primary_key)
+                .where(expired)
+                .limit(batch_size)
+            )
+        ).run()
+
     print("Successfully removed old sessions")
+
+
+def clean_sync(batch_size: int = 1000):
+    """
+    A sync equivalent of :func:`clean`.
+    """
+    run_sync(clean(batch_size=batch_size))
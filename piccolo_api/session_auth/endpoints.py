@@ -7,7 +7,6 @@ from abc import ABCMeta, abstractmethod
 from datetime import datetime, timedelta
 from json import JSONDecodeError
 
-from jinja2 import Environment, FileSystemLoader
 from piccolo.apps.user.tables import BaseUser
 from starlette.endpoints import HTTPEndpoint, Request
 from starlette.exceptions import HTTPException
@@ -23,6 +22,7 @@ from piccolo_api.mfa.provider import MFAProvider
 from piccolo_api.session_auth.tables import SessionsBase
 from piccolo_api.shared.auth.hooks import LoginHooks
 from piccolo_api.shared.auth.styles import Styles
+from piccolo_api.shared.templates import get_template
 
 if t.TYPE_CHECKING:  # pragma: no cover
     from jinja2 import Template
@@ -514,11 +514,7 @@ def session_login(
         LOGIN_TEMPLATE_PATH if template_path is None else template_path
     )
 
-    directory, filename = os.path.split(template_path)
-    environment = Environment(
-        loader=FileSystemLoader(directory), autoescape=True
-    )
-    login_template = environment.get_template(filename)
+    login_template = get_template(template_path)
 
     class _SessionLoginEndpoint(SessionLoginEndpoint):
         _auth_table = auth_table
@@ -569,11 +565,7 @@ def session_logout(
         LOGOUT_TEMPLATE_PATH if template_path is None else template_path
     )
 
-    directory, filename = os.path.split(template_path)
-    environment = Environment(
-        loader=FileSystemLoader(directory), autoescape=True
-    )
-    logout_template = environment.get_template(filename)
+    logout_template = get_template(template_path)
 
     class _SessionLogoutEndpoint(SessionLogoutEndpoint):
         _session_table = session_table
@@ -12,9 +12,13 @@ from starlette.authentication import (
 )
 from starlette.requests import HTTPConnection
 
+from piccolo_api.session_auth.cache import SessionCache
 from piccolo_api.session_auth.tables import SessionsBase
 from piccolo_api.shared.auth import UnauthenticatedUser, User
-from piccolo_api.shared.auth.excluded_paths import check_excluded_paths
+from piccolo_api.shared.auth.excluded_paths import (
+    ExcludedPathMatcher,
+    check_excluded_paths,
+)
 
 
 class SessionsAuthBackend(AuthenticationBackend):
@@ -33,6 +37,8 @@ class SessionsAuthBackend(AuthenticationBackend):
         increase_expiry: t.Optional[timedelta] = None,
         allow_unauthenticated: bool = False,
         excluded_paths: t.Optional[t.Sequence[str]] = None,
+        session_cache_ttl: float = 0,
+        session_cache_size: int = 10000,
     ):
         """
         :param auth_table:
@@ -64,6 +70,24 @@ class SessionsAuthBackend(AuthenticationBackend):
         :param excluded_paths:
             These paths don't require a session cookie - useful if you want to
             exclude a few URLs, such as docs.
+        :param session_cache_ttl:
+            If set, once a session has been looked up, the matching user is
+            cached in memory for this many seconds, so repeat requests with
+            the same session cookie don't need to query the database. Entries
+            are never kept beyond the session's own expiry. The cache is held
+            separately by each process, and when a session is removed (for
+            example, when logging out), or the user changes their password,
+            it's only evicted from the caches in that process. If you run
+            more than one worker, the other workers keep accepting the
+            session until their cache entry expires - so this value is the
+            upper bound on how long a revoked session can still be used.
+            Other changes to the user (for example, being made inactive)
+            aren't seen until the cache entry expires, unless you call
+            :func:`evict_cached_sessions <piccolo_api.session_auth.cache.evict_cached_sessions>`,
+            which also only affects the current process. Also, ``increase_expiry`` only takes effect when
+            the cache is missed. It's disabled by default.
+        :param session_cache_size:
+            The maximum number of sessions to keep in the cache.
 
         """  # noqa: E501
         super().__init__()
@@ -76,6 +100,14 @@ class SessionsAuthBackend(AuthenticationBackend):
         self.increase_expiry = increase_expiry
         self.allow_unauthenticated = allow_unauthenticated
         self.excluded_paths = excluded_paths or []
+        self._excluded_path_matcher = ExcludedPathMatcher(self.excluded_paths)
+        self.session_cache_ttl = session_cache_ttl
+        self.session_cache_size = session_cache_size
+        self._session_cache = (
+            SessionCache(ttl=session_cache_ttl, size=session_cache_size)
+            if session_cache_ttl
+            else None
+        )
 
     @check_excluded_paths
     async def authenticate(
@@ -88,28 +120,42 @@ class SessionsAuthBackend(AuthenticationBackend):
             else:
                 raise AuthenticationError("No session cookie found.")
 
-        user_id = await self.session_table.get_user_id(
-            token, increase_expiry=self.increase_expiry
-        )
-
-        if not user_id:
-            if self.allow_unauthenticated:
-                return (AuthCredentials(scopes=[]), UnauthenticatedUser())
-            else:
-                raise AuthenticationError("No matching session found.")
-
-        piccolo_user = (
-            await self.auth_table.objects()
-            .where(self.auth_table._meta.primary_key == user_id)
-            .first()
-            .run()
-        )
-
-        if not piccolo_user:
-            if self.allow_unauthenticated:
-                return (AuthCredentials(scopes=[]), UnauthenticatedUser())
-            else:
-                raise AuthenticationError("That user doesn't exist anymore")
+        session_cache = self._session_cache
+        piccolo_user = session_cache.get(token) if session_cache else None
+
+        if piccolo_user is None:
+            user_id = await self.session_table.get_user_id(
+                token, increase_expiry=self.increase_expiry
+            )
+
+            if not user_id:
+                if self.allow_unauthenticated:
+                    return (AuthCredentials(scopes=[]), UnauthenticatedUser())
+                else:
+                    raise AuthenticationError("No matching session found.")
+
+            piccolo_user = (
+                await self.auth_table.objects()
+                .where(self.auth_table._meta.primary_key == user_id)
+                .first()
+                .run()
+            )
+
+            if not piccolo_user:
+                if self.allow_unauthenticated:
+                    return (AuthCredentials(scopes=[]), UnauthenticatedUser())
+                else:
+                    raise AuthenticationError(
+                        "That user doesn't exist anymore"
+                    )
+
+            if session_cache:
+                # Don't cache the session beyond when it expires.
+                session_expiry = await self.session_table.get_expiry(token)
+                if session_expiry is not None:
+                    session_cache.set(
+                        token, piccolo_user, session_expiry=session_expiry
+                    )
 
         if self.admin_only and not piccolo_user.admin:
             raise AuthenticationError("Admin users only")
@@ -0,0 +1,38 @@
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from piccolo.columns.column_types import Timestamp, Varchar
+
+ID = "2026-10-17T13:49:07:504267"
+VERSION = "1.36.0"
+DESCRIPTION = "Add indexes to token and expiry_date"
+
+
+async def forwards():
+    manager = MigrationManager(
+        migration_id=ID, app_name="session_auth", description=DESCRIPTION
+    )
+
+    manager.alter_column(
+        table_class_name="SessionsBase",
+        tablename="sessions",
+        column_name="token",
+        db_column_name="token",
+        params={"index": True},
+        old_params={"index": False},
+        column_class=Varchar,
+        old_column_class=Varchar,
+        schema=None,
+    )
+
+    manager.alter_column(
+        table_class_name="SessionsBase",
+        tablename="sessions",
+        column_name="expiry_date",
+        db_column_name="expiry_date",
+        params={"index": True},
+        old_params={"index": False},
+        column_class=Timestamp,
+        old_column_class=Timestamp,
+        schema=None,
+    )
+
+    return manager
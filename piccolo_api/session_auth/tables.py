@@ -9,6 +9,8 @@ from piccolo.columns.defaults.timestamp import TimestampOffset
 from piccolo.table import Table
 from piccolo.utils.sync import run_sync
 
+from piccolo_api.session_auth.cache import evict_cached_sessions
+
 
 class SessionsBase(Table, tablename="sessions"):
     """
@@ -18,14 +20,14 @@ class SessionsBase(Table, tablename="sessions"):
     id: Serial
 
     #: Stores the session token.
-    token: Varchar = Varchar(length=100, null=False)
+    token: Varchar = Varchar(length=100, null=False, index=True)
 
     #: Stores the user ID.
     user_id: Integer = Integer(null=False)
 
     #: Stores the expiry date for this session.
     expiry_date: Timestamp = Timestamp(
-        default=TimestampOffset(hours=1), null=False
+        default=TimestampOffset(hours=1), null=False, index=True
     )
 
     #: We set a hard limit on the expiry date - it can keep on getting extended
@@ -69,6 +71,53 @@ class SessionsBase(Table, tablename="sessions"):
         """
         return run_sync(cls.create_session(user_id, expiry_date))
 
+    @classmethod
+    async def create_sessions(
+        cls,
+        user_ids: t.Sequence[int],
+        expiry_date: t.Optional[datetime] = None,
+        max_expiry_date: t.Optional[datetime] = None,
+    ) -> t.List[SessionsBase]:
+        """
+        Creates a session for each of the given users, using a single
+        ``INSERT`` query, rather than one per session.
+        """
+        if not user_ids:
+            return []
+
+        while True:
+            tokens = [secrets.token_urlsafe(nbytes=32) for _ in user_ids]
+            if not await cls.exists().where(cls.token.is_in(tokens)).run():
+                break
+
+        sessions = [
+            cls(token=token, user_id=user_id)
+            for token, user_id in zip(tokens, user_ids)
+        ]
+        for session in sessions:
+            if expiry_date:
+                session.expiry_date = expiry_date
+            if max_expiry_date:
+                session.max_expiry_date = max_expiry_date
+
+        await cls.insert(*sessions).run()
+
+        return sessions
+
+    @classmethod
+    def create_sessions_sync(
+        cls,
+        user_ids: t.Sequence[int],
+        expiry_date: t.Optional[datetime] = None,
+        max_expiry_date: t.Optional[datetime] = None,
+    ) -> t.List[SessionsBase]:
+        """
+        A sync equivalent of :meth:`create_sessions`.
+        """
+        return run_sync(
+            cls.create_sessions(user_ids, expiry_date, max_expiry_date)
+        )
+
     @classmethod
     async def get_user_id(
         cls, token: str, increase_expiry: t.Optional[timedelta] = None
@@ -102,6 +151,23 @@ class SessionsBase(Table, tablename="sessions"):
         else:
             return None
 
+    @classmethod
+    async def get_expiry(cls, token: str) -> t.Optional[datetime]:
+        """
+        Returns when the session expires - the earlier of ``expiry_date`` and
+        ``max_expiry_date`` - or ``None`` if there's no matching session.
+        """
+        session = (
+            await cls.select(cls.expiry_date, cls.max_expiry_date)
+            .where(cls.token == token)
+            .first()
+            .run()
+        )
+        if not session:
+            return None
+
+        return min(session["expiry_date"], session["max_expiry_date"])
+
     @classmethod
     def get_user_id_sync(cls, token: str) -> t.Optional[int]:
         """
@@ -112,9 +178,11 @@ class SessionsBase(Table, tablename="sessions"):
     @classmethod
     async def remove_session(cls, token: str):
         """
-        Deletes a matching session from the database.
+        Deletes a matching session from the database, and evicts it from any
+        session caches.
         """
         await cls.delete().where(cls.token == token).run()
+        evict_cached_sessions(token=token)
 
     @classmethod
     def remove_session_sync(cls, token: str):
@@ -1,5 +1,9 @@
+from __future__ import annotations
+
+import asyncio
 import inspect
 import typing as t
+import weakref
 from dataclasses import dataclass
 
 import httpx
@@ -44,6 +48,49 @@ class Captcha:
         return None
 
 
+# httpx clients can't be shared between event loops, so we keep one per loop.
+# This means repeat validations reuse the client's connection pool, rather
+# than opening a new connection (and doing a TLS handshake) each time.
+_CLIENTS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def _get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=10)
+        )
+        _CLIENTS[loop] = client
+    return client
+
+
+async def aclose_clients() -> None:
+    """
+    :func:`hcaptcha` and :func:`recaptcha_v2` keep a HTTP client open for
+    each event loop, so connections to the CAPTCHA provider can be reused.
+    Call this when your app shuts down (for example, in its lifespan handler)
+    to close the client for the running event loop.
+
+    .. code-block:: python
+
+        from contextlib import asynccontextmanager
+
+        from piccolo_api.shared.auth.captcha import aclose_clients
+
+        @asynccontextmanager
+        async def lifespan(app):
+            yield
+            await aclose_clients()
+
+    """
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
 @dataclass
 class TestCredentials:
     site_key: str
@@ -76,17 +123,16 @@ def hcaptcha(site_key: str, secret_key: str) -> Captcha:
         if not token:
             return "Unable to find CAPTCHA token."
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://hcaptcha.com/siteverify",
-                data={
-                    "secret": secret_key,
-                    "response": token,
-                },
-            )
-            data = response.json()
-            if not data.get("success", None) is True:
-                return "CAPTCHA failed."
+        response = await _get_client().post(
+            "https://hcaptcha.com/siteverify",
+            data={
+                "secret": secret_key,
+                "response": token,
+            },
+        )
+        data = response.json()
+        if not data.get("success", None) is True:
+            return "CAPTCHA failed."
 
         return None
 
@@ -125,17 +171,16 @@ def recaptcha_v2(site_key: str, secret_key: str) -> Captcha:
         if not token:
             return "Unable to find CAPTCHA token."
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://www.google.com/recaptcha/api/siteverify",
-                data={
-                    "secret": secret_key,
-                    "response": token,
-                },
-            )
-            data = response.json()
-            if not data.get("success", None) is True:
-                return "CAPTCHA failed."
+        response = await _get_client().post(
+            "https://www.google.com/recaptcha/api/siteverify",
+            data={
+                "secret": secret_key,
+                "response": token,
+            },
+        )
+        data = response.json()
+        if not data.get("success", None) is True:
+            return "CAPTCHA failed."
 
         return None
 
@@ -9,34 +9,62 @@ from starlette.requests import HTTPConnection
 from piccolo_api.shared.auth import UnauthenticatedUser
 
 
+class ExcludedPathMatcher:
+    """
+    The excluded paths are split into exact matches, and prefixes (those
+    ending in a wildcard), once, so each request only needs a set lookup and a
+    single ``startswith`` call.
+    """
+
+    def __init__(self, excluded_paths: t.Sequence[str]):
+        #: A snapshot of the excluded paths the matcher was built from.
+        self.excluded_paths = tuple(excluded_paths)
+        self.exact_paths = frozenset(
+            i for i in excluded_paths if not i.endswith("*")
+        )
+        self.prefixes = tuple(
+            i.rstrip("*") for i in excluded_paths if i.endswith("*")
+        )
+
+    def matches(self, conn: HTTPConnection) -> bool:
+        return (conn.scope["path"] in self.exact_paths) or bool(
+            self.prefixes
+            and conn.scope["raw_path"]
+            .decode("utf-8")
+            .startswith(self.prefixes)
+        )
+
+
 def check_excluded_paths(authenticate_func: t.Callable):
+    """
+    The backend's ``excluded_paths`` are parsed into an
+    :class:`ExcludedPathMatcher` the first time it's used, which is stored on
+    the backend. It's rebuilt if ``excluded_paths`` is replaced, or changed
+    in place.
+    """
 
     @functools.wraps(authenticate_func)
     async def authenticate(self: AuthenticationBackend, conn: HTTPConnection):
-        conn_path = dict(conn)
-
         excluded_paths = getattr(self, "excluded_paths", None)
 
         if excluded_paths is None:
             raise ValueError("excluded_paths isn't defined")
 
-        for excluded_path in excluded_paths:
-            if excluded_path.endswith("*"):
-                if (
-                    conn_path["raw_path"]
-                    .decode("utf-8")
-                    .startswith(excluded_path.rstrip("*"))
-                ):
-                    return (
-                        AuthCredentials(scopes=[]),
-                        UnauthenticatedUser(),
-                    )
-            else:
-                if conn_path["path"] == excluded_path:
-                    return (
-                        AuthCredentials(scopes=[]),
-                        UnauthenticatedUser(),
-                    )
+        if excluded_paths:
+            matcher: t.Optional[ExcludedPathMatcher] = getattr(
+                self, "_excluded_path_matcher", None
+            )
+            if matcher is None or matcher.excluded_paths != tuple(
+                excluded_paths
+            ):
+                matcher = ExcludedPathMatcher(excluded_paths)
+                setattr(self, "_excluded_path_matcher", matcher)
+
+            if matcher.matches(conn):
+                return (
+                    AuthCredentials(scopes=[]),
+                    UnauthenticatedUser(),
+                )
 
         return await authenticate_func(self=self, conn=conn)
 
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import functools
+import os
+
+from jinja2 import Environment, FileSystemLoader, Template
+
+
+@functools.lru_cache(maxsize=32)
+def get_environment(directory: str) -> Environment:
+    """
+    Returns a Jinja ``Environment`` for loading templates from the given
+    directory.
+
+    The environments are cached, so endpoints which share a template
+    directory also share the compiled templates, rather than each endpoint
+    factory compiling its own copy.
+    """
+    return Environment(loader=FileSystemLoader(directory), autoescape=True)
+
+
+def get_template(template_path: str) -> Template:
+    """
+    :param template_path:
+        The absolute path to a Jinja template, for example
+        ``'/some_directory/login.html'``.
+    """
+    directory, filename = os.path.split(template_path)
+    return get_environment(directory).get_template(filename)
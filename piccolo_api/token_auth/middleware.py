@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hmac
 import typing as t
 from abc import ABCMeta, abstractmethod
 
@@ -14,7 +15,10 @@ from starlette.authentication import (
 from starlette.requests import HTTPConnection
 
 from piccolo_api.shared.auth import User
-from piccolo_api.shared.auth.excluded_paths import check_excluded_paths
+from piccolo_api.shared.auth.excluded_paths import (
+    ExcludedPathMatcher,
+    check_excluded_paths,
+)
 from piccolo_api.token_auth.tables import TokenAuth
 
 
@@ -39,7 +43,15 @@ class SecretTokenAuthProvider(TokenAuthProvider):
         self.tokens = tokens
 
     async def get_user(self, token: str) -> SimpleUser:
-        if token in self.tokens:
+        # Every token is compared in constant time, without short circuiting,
+        # so the time taken doesn't reveal how close the token was to a
+        # valid one, or which one it matched.
+        token_bytes = token.encode()
+        found = False
+        for valid_token in self.tokens:
+            found |= hmac.compare_digest(token_bytes, valid_token.encode())
+
+        if found:
             user = SimpleUser(username="secret_token_user")
             return user
 
@@ -49,6 +61,11 @@ class SecretTokenAuthProvider(TokenAuthProvider):
 class PiccoloTokenAuthProvider(TokenAuthProvider):
     """
     Use this when the token is stored in a Piccolo database table.
+
+    The token is looked up using the database's equality comparison, which
+    isn't guaranteed to be constant time. The tokens are long and random, so
+    this isn't a practical concern, but use ``SecretTokenAuthProvider`` if you
+    need a constant time comparison.
     """
 
     def __init__(
@@ -98,6 +115,7 @@ class TokenAuthBackend(AuthenticationBackend):
         super().__init__()
         self.token_auth_provider = token_auth_provider
         self.excluded_paths = excluded_paths or []
+        self._excluded_path_matcher = ExcludedPathMatcher(self.excluded_paths)
 
     def extract_token(self, header: str) -> str:
         try:
@@ -3,6 +3,7 @@
 # To run all in a file tests/test_foo.py
 # To run all in a class tests/test_foo.py::TestFoo
 # To run a single test tests/test_foo.py::TestFoo::test_foo
+# To run the tests in parallel -n auto --dist loadscope
 
 export PYTHONPATH="$PWD:$PYTHONPATH"
 export PICCOLO_CONF="tests.postgres_conf"
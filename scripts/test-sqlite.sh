@@ -3,8 +3,9 @@
 # To run all in a file tests/test_foo.py
 # To run all in a class tests/test_foo.py::TestFoo
 # To run a single test tests/test_foo.py::TestFoo::test_foo
+# To run the tests in parallel -n auto --dist loadscope
 
 export PYTHONPATH="$PWD:$PYTHONPATH"
-export PICCOLO_CONF="tests.sqlite_conf"
+export PICCOLO_CONF="tests.sqlite_memory_conf"
 
 python -m pytest --ignore=e2e --cov=piccolo_api --cov-report xml --cov-report html --cov-fail-under 85 -s $@
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import typing as t
+
+from piccolo.table import (
+    Table,
+    create_db_tables_sync,
+    drop_db_tables_sync,
+    sort_table_classes,
+)
+from piccolo.testing.test_case import AsyncTableTest
+from piccolo.utils.sync import run_sync
+
+
+async def clear_db_tables(*tables: t.Type[Table]) -> None:
+    """
+    Removes all rows from the tables, and resets their primary keys. This is
+    much faster than dropping and recreating the tables.
+    """
+    if not tables:
+        return
+
+    engine = tables[0]._meta.db
+
+    if engine.engine_type in ("postgres", "cockroach"):
+        tablenames = ", ".join(
+            table._meta.get_formatted_tablename() for table in tables
+        )
+        await tables[0].raw(f"TRUNCATE {tablenames} RESTART IDENTITY CASCADE")
+    else:
+        # SQLite reuses the primary key values once a table is empty. Delete
+        # child tables first, to satisfy any foreign key constraints.
+        for table in reversed(sort_table_classes(list(tables))):
+            await table.delete(force=True)
+
+
+def clear_db_tables_sync(*tables: t.Type[Table]) -> None:
+    run_sync(clear_db_tables(*tables))
+
+
+class AsyncTruncatingTableTest(AsyncTableTest):
+    """
+    Like ``AsyncTableTest``, except the tables are only created once per
+    class. Between tests the rows are removed, instead of dropping and
+    recreating the tables.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        create_db_tables_sync(*cls.tables)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        drop_db_tables_sync(*cls.tables)
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        pass
+
+    async def asyncTearDown(self) -> None:
+        await clear_db_tables(*self.tables)
@@ -0,0 +1,31 @@
+import asyncio
+import os
+
+
+async def create_worker_database():
+    """
+    When running the Postgres tests in parallel using pytest-xdist, each
+    worker has its own database, which needs creating.
+    """
+    import asyncpg
+
+    from tests.postgres_conf import DATABASE, DB
+
+    config = DB.config
+    connection = await asyncpg.connect(**{**config, "database": DATABASE})
+    try:
+        exists = await connection.fetchval(
+            "SELECT 1 FROM pg_database WHERE datname = $1",
+            config["database"],
+        )
+        if not exists:
+            await connection.execute(f'CREATE DATABASE "{config["database"]}"')
+    finally:
+        await connection.close()
+
+
+def pytest_sessionstart(session):
+    if os.environ.get("PYTEST_XDIST_WORKER") and (
+        os.environ.get("PICCOLO_CONF") == "tests.postgres_conf"
+    ):
+        asyncio.run(create_worker_database())
@@ -1,12 +1,15 @@
 from unittest import TestCase
 
 from starlette.middleware.exceptions import ExceptionMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
 from starlette.testclient import TestClient
 
 from piccolo_api.csrf.middleware import (
     DEFAULT_COOKIE_NAME,
     DEFAULT_HEADER_NAME,
     CSRFMiddleware,
+    tokens_match,
 )
 
 
@@ -21,30 +24,71 @@ async def app(scope, receive, send):
     await send({"type": "http.response.body", "body": b"Hello, world!"})
 
 
+async def echo_app(scope, receive, send):
+    """
+    Responds with the request body, so we can check it's still readable after
+    the middleware has parsed the form.
+    """
+    request = Request(scope, receive)
+    response = Response(await request.body())
+    await response(scope, receive, send)
+
+
 WRAPPED_APP = ExceptionMiddleware(CSRFMiddleware(app, allow_form_param=True))
+ECHO_APP = ExceptionMiddleware(CSRFMiddleware(echo_app, allow_form_param=True))
 HOST_RESTRICTED_APP = ExceptionMiddleware(
     CSRFMiddleware(app, allowed_hosts=["foo.com"], allow_form_param=True)
 )
 
+CSRF_TOKEN = CSRFMiddleware.get_new_token()
+
 
 class TestCSRFMiddleware(TestCase):
-    csrf_token = CSRFMiddleware.get_new_token()
+    csrf_token = CSRF_TOKEN
     incorrect_csrf_token = "abc123"
 
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(WRAPPED_APP)
+        cls.host_client = TestClient(HOST_RESTRICTED_APP)
+
+    def setUp(self):
+        # The clients are shared, so make sure cookies set by one test don't
+        # leak into the next.
+        self.client.cookies.clear()
+        self.host_client.cookies.clear()
+
     def test_get_request(self):
         """
         Make sure a cookie was set.
         """
-        client = TestClient(WRAPPED_APP)
+        client = self.client
         response = client.get("/")
 
-        self.assertIsNot(response.cookies.get("csrftoken"), None)
+        self.assertIsNotNone(response.cookies.get("csrftoken"))
+        self.assertEqual(
+            response.headers["set-cookie"],
+            f"csrftoken={response.cookies['csrftoken']}; Max-Age=31536000; "
+            "Path=/; SameSite=lax",
+        )
+
+    def test_get_request_existing_cookie(self):
+        """
+        Make sure a new cookie isn't set if the client already has one.
+        """
+        client = self.client
+        response = client.get(
+            "/", cookies={DEFAULT_COOKIE_NAME: self.csrf_token}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("set-cookie", response.headers)
 
     def test_missing_token_rejected(self):
         """
         Make sure a post request without a CSRF token is rejected.
         """
-        client = TestClient(WRAPPED_APP)
+        client = self.client
         response = client.post("/")
 
         self.assertEqual(response.status_code, 403)
@@ -55,7 +99,7 @@ class TestCSRFMiddleware(TestCase):
         Make sure a post containing a CSRF cookie and matching header token are
         accepted.
         """
-        client = TestClient(WRAPPED_APP)
+        client = self.client
 
         response = client.post(
             "/",
@@ -69,7 +113,7 @@ class TestCSRFMiddleware(TestCase):
         Make sure a post containing a CSRF cookie and matching form token are
         accepted.
         """
-        client = TestClient(WRAPPED_APP)
+        client = self.client
 
         response = client.post(
             "/",
@@ -78,11 +122,29 @@ class TestCSRFMiddleware(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    def test_form_body_readable(self):
+        """
+        Make sure the wrapped app can still read the body, after the
+        middleware has parsed the form.
+        """
+        client = TestClient(ECHO_APP)
+
+        response = client.post(
+            "/",
+            cookies={DEFAULT_COOKIE_NAME: self.csrf_token},
+            data={DEFAULT_COOKIE_NAME: self.csrf_token, "name": "bob"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.content,
+            f"{DEFAULT_COOKIE_NAME}={self.csrf_token}&name=bob".encode(),
+        )
+
     def test_token_mismatch_rejected(self):
         """
         Make sure that just including a header or cookie doesn't somehow work.
         """
-        client = TestClient(WRAPPED_APP)
+        client = self.client
 
         kwargs = [
             # Incorrect header, correct cookie
@@ -90,6 +152,13 @@ class TestCSRFMiddleware(TestCase):
                 "cookies": {DEFAULT_COOKIE_NAME: self.csrf_token},
                 "headers": {DEFAULT_HEADER_NAME: self.incorrect_csrf_token},
             },
+            # Incorrect header of the same length, correct cookie
+            {
+                "cookies": {DEFAULT_COOKIE_NAME: self.csrf_token},
+                "headers": {
+                    DEFAULT_HEADER_NAME: CSRFMiddleware.get_new_token()
+                },
+            },
             # Incorrect cookie, correct header token
             {
                 "cookies": {DEFAULT_COOKIE_NAME: self.incorrect_csrf_token},
@@ -118,7 +187,7 @@ class TestCSRFMiddleware(TestCase):
         cookies = {DEFAULT_COOKIE_NAME: self.csrf_token}
         base_headers = {DEFAULT_HEADER_NAME: self.csrf_token}
 
-        client = TestClient(HOST_RESTRICTED_APP)
+        client = self.host_client
         valid_domain = "https://foo.com"
 
         kwargs = [
@@ -132,7 +201,7 @@ class TestCSRFMiddleware(TestCase):
             response = client.post(
                 valid_domain,
                 cookies=cookies,
-                headers=dict(base_headers, **_kwargs),
+                headers={**base_headers, **_kwargs},
             )
             self.assertEqual(response.status_code, 200)
 
@@ -144,7 +213,7 @@ class TestCSRFMiddleware(TestCase):
         cookies = {DEFAULT_COOKIE_NAME: self.csrf_token}
         base_headers = {DEFAULT_HEADER_NAME: self.csrf_token}
 
-        client = TestClient(HOST_RESTRICTED_APP)
+        client = self.host_client
         invalid_domain = "https://bar.com"
 
         kwargs = [{"referer": invalid_domain}, {"origin": invalid_domain}, {}]
@@ -153,11 +222,69 @@ class TestCSRFMiddleware(TestCase):
             response = client.post(
                 "https://foo.com",
                 cookies=cookies,
-                headers=dict(base_headers, **_kwargs),
+                headers={**base_headers, **_kwargs},
             )
             self.assertEqual(response.status_code, 403)
 
 
+class TestGetCookieToken(TestCase):
+    def test_get_cookie_token(self):
+        """
+        Make sure the token is extracted from the cookie header, regardless
+        of the other cookies present.
+        """
+        middleware = CSRFMiddleware(app)
+
+        for cookie_header, expected in (
+            (None, None),
+            ("", None),
+            ("csrftoken=abc", "abc"),
+            ("foo=bar; csrftoken=abc; baz=1", "abc"),
+            ("foo=bar;csrftoken=abc", "abc"),
+            ("mycsrftoken=xyz; csrftoken=abc", "abc"),
+            ("mycsrftoken=xyz", None),
+            ("csrftoken=abc; csrftoken=def", "def"),
+            ("csrftoken=", ""),
+        ):
+            headers = (
+                []
+                if cookie_header is None
+                else [(b"cookie", cookie_header.encode())]
+            )
+            request = Request({"type": "http", "headers": headers})
+            with self.subTest(cookie_header=cookie_header):
+                self.assertEqual(
+                    middleware.get_cookie_token(request), expected
+                )
+                if cookie_header:
+                    # Make sure it's consistent with Starlette.
+                    self.assertEqual(
+                        middleware.get_cookie_token(request),
+                        request.cookies.get(DEFAULT_COOKIE_NAME),
+                    )
+
+
+class TestGetNewToken(TestCase):
+    def test_get_new_token(self):
+        """
+        Make sure the tokens are random, and safe to use in a cookie.
+        """
+        token = CSRFMiddleware.get_new_token()
+
+        self.assertEqual(len(token), 32)
+        self.assertRegex(token, r"^[A-Za-z0-9_-]+$")
+        self.assertNotEqual(token, CSRFMiddleware.get_new_token())
+
+
+class TestTokensMatch(TestCase):
+    def test_tokens_match(self):
+        self.assertTrue(tokens_match("abc123", "abc123"))
+        self.assertFalse(tokens_match("abc123", "abc124"))
+        self.assertFalse(tokens_match("abc123", "abc"))
+        self.assertFalse(tokens_match("abc123", None))
+        self.assertFalse(tokens_match("abc", "ab\u00e7"))
+
+
 if __name__ == "__main__":
     # For manual testing:
     # python -m tests.csrf.test_csrf
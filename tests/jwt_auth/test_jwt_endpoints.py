@@ -1,6 +1,8 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from piccolo.apps.user.tables import BaseUser
+from piccolo.table import create_db_tables_sync, drop_db_tables_sync
 from starlette.exceptions import HTTPException
 from starlette.routing import Route, Router
 from starlette.testclient import TestClient
@@ -10,23 +12,25 @@ from piccolo_api.token_auth.tables import TokenAuth
 
 APP = Router([Route("/", jwt_login(secret="SECRET"))])
 
+# The login endpoint doesn't set any cookies, so the client can be shared.
+CLIENT = TestClient(APP)
 
+
+@patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
 class TestLoginEndpoint(TestCase):
     credentials = {"username": "Bob", "password": "bob123"}
 
     def setUp(self):
-        BaseUser.create_table().run_sync()
-        TokenAuth.create_table().run_sync()
+        create_db_tables_sync(BaseUser, TokenAuth)
 
     def tearDown(self):
-        TokenAuth.alter().drop_table().run_sync()
-        BaseUser.alter().drop_table().run_sync()
+        drop_db_tables_sync(BaseUser, TokenAuth)
 
     def test_login_success(self):
         user = BaseUser(**self.credentials)
         user.save().run_sync()
 
-        client = TestClient(APP)
+        client = CLIENT
         response = client.post("/", json=self.credentials)
 
         self.assertEqual(response.status_code, 200)
@@ -36,7 +40,7 @@ class TestLoginEndpoint(TestCase):
         user = BaseUser(**self.credentials)
         user.save().run_sync()
 
-        client = TestClient(APP)
+        client = CLIENT
         with self.assertRaises(HTTPException):
             response = client.post(
                 "/", json={"username": "Bob", "password": "wrong"}
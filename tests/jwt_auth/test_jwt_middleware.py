@@ -1,8 +1,8 @@
 import datetime
 from unittest import TestCase
+from unittest.mock import patch
 
 import jwt
-from piccolo.apps.user.tables import BaseUser
 from starlette.endpoints import HTTPEndpoint
 from starlette.exceptions import HTTPException
 from starlette.requests import Request
@@ -11,7 +11,6 @@ from starlette.routing import Route, Router
 from starlette.testclient import TestClient
 
 from piccolo_api.jwt_auth.middleware import JWTError, JWTMiddleware
-from piccolo_api.token_auth.tables import TokenAuth
 
 
 class EchoEndpoint(HTTPEndpoint):
@@ -30,18 +29,19 @@ APP_UNAUTH = JWTMiddleware(
     asgi=ECHO_APP, secret="SECRET", allow_unauthenticated=True
 )
 
+# These are stateless, so can be shared between tests.
+CLIENT = TestClient(APP)
+CLIENT_UNAUTH = TestClient(APP_UNAUTH)
 
-class TestJWTMiddleware(TestCase):
-    def setUp(self):
-        BaseUser.create_table().run_sync()
-        TokenAuth.create_table().run_sync()
 
-    def tearDown(self):
-        TokenAuth.alter().drop_table().run_sync()
-        BaseUser.alter().drop_table().run_sync()
+class TestJWTMiddleware(TestCase):
+    """
+    None of these tests get as far as querying the user table - the token is
+    rejected first - so no database tables are needed.
+    """
 
     def test_empty_token(self):
-        client = TestClient(APP)
+        client = CLIENT
 
         with self.assertRaises(HTTPException):
             response = client.get("/")
@@ -52,11 +52,7 @@ class TestJWTMiddleware(TestCase):
             )
 
         # allow_unauthenticated
-        client = TestClient(
-            JWTMiddleware(
-                asgi=ECHO_APP, secret="SECRET", allow_unauthenticated=True
-            )
-        )
+        client = CLIENT_UNAUTH
         response = client.get("/")
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(
@@ -65,7 +61,7 @@ class TestJWTMiddleware(TestCase):
         )
 
     def test_invalid_token_format(self):
-        client = TestClient(APP)
+        client = CLIENT
 
         headers = {"authorization": "12345"}
 
@@ -78,7 +74,33 @@ class TestJWTMiddleware(TestCase):
             )
 
         # allow_unauthenticated
-        client = TestClient(APP_UNAUTH)
+        client = CLIENT_UNAUTH
+        response = client.get("/", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json(),
+            {"user_id": None, "jwt_error": JWTError.token_not_found.value},
+        )
+
+    def test_malformed_bearer_token(self):
+        """
+        A bearer token which doesn't have the three segments of a JWT is
+        treated as if no token was passed.
+        """
+        client = CLIENT
+
+        headers = {"authorization": "Bearer 12345"}
+
+        with self.assertRaises(HTTPException):
+            response = client.get("/", headers=headers)
+
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(
+                response.json()["detail"], JWTError.token_not_found.value
+            )
+
+        # allow_unauthenticated
+        client = CLIENT_UNAUTH
         response = client.get("/", headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(
@@ -87,7 +109,7 @@ class TestJWTMiddleware(TestCase):
         )
 
     def test_expired_token(self):
-        client = TestClient(APP)
+        client = CLIENT
 
         token = jwt.encode(
             {
@@ -109,7 +131,7 @@ class TestJWTMiddleware(TestCase):
             )
 
         # allow_unauthenticated
-        client = TestClient(APP_UNAUTH)
+        client = CLIENT_UNAUTH
         response = client.get("/", headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(
@@ -118,7 +140,7 @@ class TestJWTMiddleware(TestCase):
         )
 
     def test_wrong_secret(self):
-        client = TestClient(APP)
+        client = CLIENT
 
         token = jwt.encode(
             {
@@ -140,7 +162,33 @@ class TestJWTMiddleware(TestCase):
             )
 
         # allow_unauthenticated
-        client = TestClient(APP_UNAUTH)
+        client = CLIENT_UNAUTH
+        response = client.get("/", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json(),
+            {"user_id": None, "jwt_error": JWTError.token_invalid.value},
+        )
+
+    def test_malformed_token(self):
+        """
+        A token which can't be decoded should be rejected as invalid, rather
+        than raising an unhandled exception.
+        """
+        client = CLIENT
+
+        headers = {"authorization": "Bearer abc.def.ghi"}
+
+        with self.assertRaises(HTTPException):
+            response = client.get("/", headers=headers)
+
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(
+                response.json()["detail"], JWTError.token_invalid.value
+            )
+
+        # allow_unauthenticated
+        client = CLIENT_UNAUTH
         response = client.get("/", headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(
@@ -149,7 +197,7 @@ class TestJWTMiddleware(TestCase):
         )
 
     def test_missing_expiry(self):
-        client = TestClient(APP)
+        client = CLIENT
 
         token = jwt.encode(
             {
@@ -171,7 +219,7 @@ class TestJWTMiddleware(TestCase):
             )
 
         # allow_unauthenticated
-        client = TestClient(APP_UNAUTH)
+        client = CLIENT_UNAUTH
         response = client.get("/", headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(
@@ -180,7 +228,7 @@ class TestJWTMiddleware(TestCase):
         )
 
     def test_token_without_user_id(self):
-        client = TestClient(APP)
+        client = CLIENT
 
         token = jwt.encode({}, "SECRET")
         headers = {"authorization": f"Bearer {token}"}
@@ -192,10 +240,92 @@ class TestJWTMiddleware(TestCase):
             self.assertEqual(response.content, b"")
 
         # allow_unauthenticated
-        client = TestClient(APP_UNAUTH)
+        client = CLIENT_UNAUTH
         response = client.get("/", headers=headers)
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(
             response.json(),
             {"user_id": None, "jwt_error": JWTError.user_not_found.value},
         )
+
+
+class TestTokenCache(TestCase):
+    def setUp(self):
+        self.token = jwt.encode(
+            {
+                "user_id": 1,
+                "exp": datetime.datetime.now(tz=datetime.timezone.utc)
+                + datetime.timedelta(minutes=5),
+            },
+            "SECRET",
+        )
+
+    def test_cached(self):
+        """
+        Make sure a token is only verified once, and subsequent requests use
+        the cached payload.
+        """
+        middleware = JWTMiddleware(asgi=ECHO_APP, secret="SECRET")
+
+        with patch(
+            "piccolo_api.jwt_auth.middleware.jwt.decode", wraps=jwt.decode
+        ) as decode:
+            token_dict_1 = middleware.decode_token(self.token)
+            token_dict_2 = middleware.decode_token(self.token)
+
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(token_dict_1, token_dict_2)
+        self.assertEqual(token_dict_1["user_id"], 1)
+
+    def test_expired_cache_entry(self):
+        """
+        Once the cache entry expires, the token should be verified again.
+        """
+        middleware = JWTMiddleware(asgi=ECHO_APP, secret="SECRET")
+
+        with patch(
+            "piccolo_api.jwt_auth.middleware.jwt.decode", wraps=jwt.decode
+        ) as decode:
+            with patch("piccolo_api.jwt_auth.middleware.time") as time:
+                time.return_value = 1000.0
+                middleware.decode_token(self.token)
+
+                time.return_value = 1000.0 + middleware.token_cache_ttl
+                middleware.decode_token(self.token)
+
+        self.assertEqual(decode.call_count, 2)
+
+    def test_cache_disabled(self):
+        middleware = JWTMiddleware(
+            asgi=ECHO_APP, secret="SECRET", token_cache_ttl=0
+        )
+
+        with patch(
+            "piccolo_api.jwt_auth.middleware.jwt.decode", wraps=jwt.decode
+        ) as decode:
+            middleware.decode_token(self.token)
+            middleware.decode_token(self.token)
+
+        self.assertEqual(decode.call_count, 2)
+        self.assertDictEqual(middleware._token_cache, {})
+
+    def test_cache_size(self):
+        """
+        Make sure the cache doesn't grow beyond ``token_cache_size``.
+        """
+        middleware = JWTMiddleware(
+            asgi=ECHO_APP, secret="SECRET", token_cache_size=2
+        )
+
+        for user_id in range(3):
+            middleware.decode_token(jwt.encode({"user_id": user_id}, "SECRET"))
+
+        self.assertEqual(len(middleware._token_cache), 2)
+
+    def test_invalid_token_not_cached(self):
+        middleware = JWTMiddleware(asgi=ECHO_APP, secret="WRONG_SECRET")
+
+        with self.assertRaises(jwt.exceptions.InvalidSignatureError):
+            middleware.decode_token(self.token)
+
+        self.assertDictEqual(middleware._token_cache, {})
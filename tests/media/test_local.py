@@ -1,4 +1,5 @@
 import asyncio
+import io
 import os
 import shutil
 import tempfile
@@ -11,6 +12,11 @@ from piccolo.table import Table
 
 from piccolo_api.media.local import LocalMediaStorage
 
+with open(
+    os.path.join(os.path.dirname(__file__), "test_files/bulb.jpg"), "rb"
+) as f:
+    BULB_BYTES = f.read()
+
 
 class Movie(Table):
     poster = Varchar()
@@ -18,21 +24,40 @@ class Movie(Table):
 
 
 class TestLocalMediaStorage(TestCase):
+    _media_dir: tempfile.TemporaryDirectory
+    media_path: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._media_dir = tempfile.TemporaryDirectory()
+        cls.media_path = cls._media_dir.name
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._media_dir.cleanup()
+
     def setUp(self) -> None:
         Movie.create_table(if_not_exists=True).run_sync()
 
     def tearDown(self):
         Movie.alter().drop_table().run_sync()
 
+        # Only remove what the test created, rather than recreating the
+        # whole media folder each time.
+        for file_name in os.listdir(self.media_path):
+            path = os.path.join(self.media_path, file_name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
     def test_folder_created(self):
         """
         If the media folder doesn't exist, then ``LocalMediaStorage`` should
         try and create it.
         """
-        media_path = os.path.join(tempfile.gettempdir(), "randomfolder")
-
-        if os.path.exists(media_path):
-            shutil.rmtree(media_path)
+        media_path = os.path.join(self.media_path, "randomfolder")
+        self.assertFalse(os.path.exists(media_path))
 
         LocalMediaStorage(column=Movie.poster, media_path=media_path)
 
@@ -47,68 +72,58 @@ class TestLocalMediaStorage(TestCase):
             "fd0125c7-8777-4976-83c1-81605d5ab155"
         )
 
-        media_path = os.path.join(tempfile.gettempdir(), "piccolo-admin-media")
+        media_path = self.media_path
 
-        if os.path.exists(media_path):
-            shutil.rmtree(media_path)
+        storage = LocalMediaStorage(column=Movie.poster, media_path=media_path)
 
-        os.mkdir(media_path)
+        test_file = io.BytesIO(BULB_BYTES)
 
-        storage = LocalMediaStorage(column=Movie.poster, media_path=media_path)
+        # Store the file
+        file_key = storage.store_file_sync(
+            file_name="bulb.jpg", file=test_file
+        )
+
+        # Make sure the file was stored.
+        self.assertIn(file_key, os.listdir(media_path))
+
+        # Make sure the permissions are correct
+        self.assertEqual(
+            oct(os.stat(os.path.join(media_path, file_key)).st_mode)[-3:],
+            "600",
+        )
+
+        # Retrieve the URL for the file
+        url = storage.generate_file_url_sync(file_key, root_url="/media/")
+        self.assertEqual(
+            url, "/media/bulb-fd0125c7-8777-4976-83c1-81605d5ab155.jpg"
+        )
+
+        # Retrieve the file itself
+        file = asyncio.run(storage.get_file(file_key=file_key))
+        assert file is not None
+        self.assertEqual(file.read(), BULB_BYTES)
+        file.close()
+
+        # Make sure that a value is raised if we try saving a file with the
+        # same name.
+        with self.assertRaises(IOError):
+            storage.store_file_sync(file_name="bulb.jpg", file=test_file)
+
+        # List all of the files
+        file_list = asyncio.run(storage.get_file_keys())
+        self.assertEqual(file_list, [file_key])
+
+        # Delete the file
+        asyncio.run(storage.delete_file(file_key=file_key))
+        self.assertEqual(os.listdir(storage.media_path), [])
+
+        # Test bulk deletion
+        for file_name in ("file_1.txt", "file_2.txt", "file_3.txt"):
+            with open(os.path.join(media_path, file_name), "w") as f:
+                f.write("test")
+
+        asyncio.run(
+            storage.bulk_delete_files(file_keys=["file_1.txt", "file_2.txt"])
+        )
 
-        with open(
-            os.path.join(os.path.dirname(__file__), "test_files/bulb.jpg"),
-            "rb",
-        ) as test_file:
-            # Store the file
-            file_key = storage.store_file_sync(
-                file_name="bulb.jpg", file=test_file
-            )
-
-            # Make sure the file was stored.
-            self.assertIn(file_key, os.listdir(media_path))
-
-            # Make sure the permissions are correct
-            self.assertEqual(
-                oct(os.stat(os.path.join(media_path, file_key)).st_mode)[-3:],
-                "600",
-            )
-
-            # Retrieve the URL for the file
-            url = storage.generate_file_url_sync(file_key, root_url="/media/")
-            self.assertEqual(
-                url, "/media/bulb-fd0125c7-8777-4976-83c1-81605d5ab155.jpg"
-            )
-
-            # Retrieve the file itself
-            file = asyncio.run(storage.get_file(file_key=file_key))
-            assert file is not None
-            test_file.seek(0, 0)
-            self.assertEqual(file.read(), test_file.read())
-            file.close()
-
-            # Make sure that a value is raised if we try saving a file with the
-            # same name.
-            with self.assertRaises(IOError):
-                storage.store_file_sync(file_name="bulb.jpg", file=test_file)
-
-            # List all of the files
-            file_list = asyncio.run(storage.get_file_keys())
-            self.assertEqual(file_list, [file_key])
-
-            # Delete the file
-            asyncio.run(storage.delete_file(file_key=file_key))
-            self.assertEqual(os.listdir(storage.media_path), [])
-
-            # Test bulk deletion
-            for file_name in ("file_1.txt", "file_2.txt", "file_3.txt"):
-                with open(os.path.join(media_path, file_name), "w") as f:
-                    f.write("test")
-
-            asyncio.run(
-                storage.bulk_delete_files(
-                    file_keys=["file_1.txt", "file_2.txt"]
-                )
-            )
-
-            self.assertListEqual(os.listdir(media_path), ["file_3.txt"])
+        self.assertListEqual(os.listdir(media_path), ["file_3.txt"])
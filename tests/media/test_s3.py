@@ -124,12 +124,61 @@ class TestS3MediaStorage(TestCase):
                     )
                     file_keys.append(file_key)
 
-                asyncio.run(storage.bulk_delete_files(file_keys=file_keys[:2]))
+                s3_client = get_client.return_value
+                with patch.object(
+                    s3_client,
+                    "delete_objects",
+                    wraps=s3_client.delete_objects,
+                ) as delete_objects:
+                    asyncio.run(
+                        storage.bulk_delete_files(file_keys=file_keys[:2])
+                    )
+
+                # The keys should be deleted in a single batch, rather than
+                # one request per key.
+                self.assertEqual(len(delete_objects.call_args_list), 1)
+                self.assertListEqual(
+                    sorted(
+                        i["Key"]
+                        for i in delete_objects.call_args.kwargs["Delete"][
+                            "Objects"
+                        ]
+                    ),
+                    sorted(f"{folder_name}/{i}" for i in file_keys[:2]),
+                )
 
                 self.assertListEqual(
                     asyncio.run(storage.get_file_keys()), file_keys[2:]
                 )
 
+    @patch("piccolo_api.media.s3.S3MediaStorage.get_client")
+    def test_bulk_delete_batches(self, get_client: MagicMock):
+        """
+        Make sure each ``delete_objects`` call only contains the keys for
+        that batch, including across the batch boundaries.
+        """
+        storage = S3MediaStorage(
+            column=Movie.poster,
+            bucket_name="bucket123",
+            folder_name="movie_posters",
+        )
+
+        file_keys = [f"file_{i}.txt" for i in range(250)]
+        storage.bulk_delete_files_sync(file_keys=file_keys)
+
+        batches = [
+            [i["Key"] for i in call.kwargs["Delete"]["Objects"]]
+            for call in get_client.return_value.delete_objects.call_args_list
+        ]
+        self.assertListEqual(
+            batches,
+            [
+                [f"movie_posters/{i}" for i in file_keys[:100]],
+                [f"movie_posters/{i}" for i in file_keys[100:200]],
+                [f"movie_posters/{i}" for i in file_keys[200:]],
+            ],
+        )
+
     @patch("piccolo_api.media.base.uuid")
     @patch("piccolo_api.media.s3.S3MediaStorage.get_client")
     def test_unsigned(self, get_client: MagicMock, uuid_module: MagicMock):
@@ -4,11 +4,12 @@ from unittest.mock import MagicMock, patch
 
 import pyotp
 from piccolo.apps.user.tables import BaseUser
-from piccolo.testing.test_case import AsyncTableTest
 
-from example_projects.mfa_demo.app import EXAMPLE_DB_ENCRYPTION_KEY
 from piccolo_api.encryption.providers import XChaCha20Provider
 from piccolo_api.mfa.authenticator.tables import AuthenticatorSecret
+from tests.base import AsyncTruncatingTableTest
+
+EXAMPLE_DB_ENCRYPTION_KEY = XChaCha20Provider.get_new_key()
 
 
 class TestGenerateSecret(TestCase):
@@ -25,7 +26,8 @@ class TestGenerateSecret(TestCase):
         self.assertEqual(len(secret_1), 32)
 
 
-class TestAuthenticate(AsyncTableTest):
+@patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
+class TestAuthenticate(AsyncTruncatingTableTest):
 
     tables = [AuthenticatorSecret, BaseUser]
 
@@ -150,7 +152,8 @@ class TestAuthenticate(AsyncTableTest):
         assert auth_response is False
 
 
-class TestCreateNew(AsyncTableTest):
+@patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
+class TestCreateNew(AsyncTruncatingTableTest):
 
     tables = [AuthenticatorSecret, BaseUser]
 
@@ -174,7 +177,8 @@ class TestCreateNew(AsyncTableTest):
         self.assertIsNone(secret.last_used_code)
 
 
-class TestRevoke(AsyncTableTest):
+@patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
+class TestRevoke(AsyncTruncatingTableTest):
     """
     Make sure we can revoke a user's MFA code.
     """
@@ -0,0 +1,16 @@
+from base64 import b64decode
+from unittest import TestCase
+
+from piccolo_api.mfa.authenticator.utils import get_b64encoded_qr_image
+
+
+class TestGetB64EncodedQRImage(TestCase):
+
+    def test_png(self):
+        """
+        Make sure a base64 encoded PNG image is returned.
+        """
+        image = get_b64encoded_qr_image(
+            data="otpauth://totp/Piccolo-MFA:bob?secret=ABC123"
+        )
+        self.assertTrue(b64decode(image).startswith(b"\x89PNG"))
@@ -1,27 +1,100 @@
+from unittest.mock import patch
+
 from piccolo.apps.user.tables import BaseUser
-from piccolo.testing.test_case import AsyncTableTest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.authentication import AuthenticationMiddleware
+from starlette.routing import Mount, Route
 from starlette.testclient import TestClient
 
-from example_projects.mfa_demo.app import app
+from piccolo_api.csrf.middleware import CSRFMiddleware
+from piccolo_api.encryption.providers import XChaCha20Provider
+from piccolo_api.mfa.authenticator.provider import AuthenticatorProvider
 from piccolo_api.mfa.authenticator.tables import AuthenticatorSecret
+from piccolo_api.mfa.endpoints import mfa_setup
+from piccolo_api.session_auth.endpoints import session_login
+from piccolo_api.session_auth.middleware import SessionsAuthBackend
 from piccolo_api.session_auth.tables import SessionsBase
+from tests.base import AsyncTruncatingTableTest
+
+
+def build_app() -> Starlette:
+    """
+    Just the parts of ``example_projects/mfa_demo`` which the tests need.
+    """
+    provider = AuthenticatorProvider(
+        encryption_provider=XChaCha20Provider(
+            encryption_key=XChaCha20Provider.get_new_key()
+        )
+    )
+
+    private_app = Starlette(
+        routes=[Route("/mfa-setup/", mfa_setup(provider=provider))],
+        middleware=[
+            Middleware(
+                AuthenticationMiddleware,
+                backend=SessionsAuthBackend(admin_only=False),
+            ),
+        ],
+    )
 
+    return Starlette(
+        routes=[
+            Route(
+                "/login/",
+                session_login(mfa_providers=[provider], redirect_to=None),
+            ),
+            Mount("/private/", private_app),
+        ],
+        middleware=[Middleware(CSRFMiddleware, allow_form_param=True)],
+    )
 
-class TestMFARegisterEndpoint(AsyncTableTest):
+
+class TestMFARegisterEndpoint(AsyncTruncatingTableTest):
 
     tables = [AuthenticatorSecret, BaseUser, SessionsBase]
     username = "alice"
     password = "test123"
+    client: TestClient
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.client = TestClient(app=build_app())
 
     async def asyncSetUp(self) -> None:
         await super().asyncSetUp()
 
+        # We don't need secure password hashes in these tests - a single
+        # iteration avoids the hashing cost on login and MFA registration.
+        patcher = patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Rendering the QR code as a PNG is relatively slow, and is tested
+        # separately.
+        qr_patcher = patch(
+            "piccolo_api.mfa.authenticator.provider.get_b64encoded_qr_image",
+            return_value="qrcode",
+        )
+        self.get_b64encoded_qr_image = qr_patcher.start()
+        self.addCleanup(qr_patcher.stop)
+
+        # The client is shared, so make sure cookies don't leak between tests.
+        self.client.cookies.clear()
+
         self.user = await BaseUser.create_user(
             username=self.username, password=self.password, active=True
         )
 
-    async def test_register(self):
-        client = TestClient(app=app)
+    def login(self) -> str:
+        """
+        Log in using the shared client, leaving the session cookie on it.
+
+        :returns: The CSRF token, for use in subsequent requests.
+
+        """
+        client = self.client
 
         # Get a CSRF cookie
         response = client.get("/login/")
@@ -37,6 +110,12 @@ class TestMFARegisterEndpoint(AsyncTableTest):
         self.assertEqual(response.status_code, 200)
         self.assertIn("id", client.cookies)
 
+        return csrf_token
+
+    async def test_register(self):
+        client = self.client
+        csrf_token = self.login()
+
         # Register for MFA - JSON
         response = client.post(
             "/private/mfa-setup/",
@@ -50,7 +129,11 @@ class TestMFARegisterEndpoint(AsyncTableTest):
         self.assertEqual(response.status_code, 200)
 
         data = response.json()
-        self.assertIn("qrcode_image", data)
+        self.assertEqual(data["qrcode_image"], "qrcode")
+        self.assertIn(
+            "otpauth://totp/",
+            self.get_b64encoded_qr_image.call_args.kwargs["data"],
+        )
         self.assertIn("recovery_codes", data)
 
         # Register for MFA - HTML
@@ -1,6 +1,9 @@
 from unittest import TestCase
 
-from piccolo_api.mfa.recovery_codes import generate_recovery_code
+from piccolo_api.mfa.recovery_codes import (
+    generate_recovery_code,
+    generate_recovery_codes,
+)
 
 
 class TestGenerateRecoveryCode(TestCase):
@@ -14,6 +17,17 @@ class TestGenerateRecoveryCode(TestCase):
             "aaaaa-aaaaa",
         )
 
+    def test_characters(self):
+        """
+        Make sure only the given characters are used.
+        """
+        for characters in ("ab", "abc123", [chr(i) for i in range(300)]):
+            code = generate_recovery_code(
+                length=20, characters=characters, separator=""
+            )
+            self.assertEqual(len(code), 20)
+            self.assertTrue(set(code).issubset(characters))
+
     def test_no_separator(self):
         self.assertEqual(
             generate_recovery_code(length=10, characters=["a"], separator=""),
@@ -23,3 +37,21 @@ class TestGenerateRecoveryCode(TestCase):
     def test_length(self):
         with self.assertRaises(ValueError):
             generate_recovery_code(length=6),
+
+
+class TestGenerateRecoveryCodes(TestCase):
+
+    def test_unique(self):
+        codes = generate_recovery_codes(count=8)
+        self.assertEqual(len(codes), 8)
+        self.assertEqual(len(set(codes)), 8)
+
+    def test_response_format(self):
+        self.assertListEqual(
+            generate_recovery_codes(count=2, length=10, characters=["a"]),
+            ["aaaaa-aaaaa", "aaaaa-aaaaa"],
+        )
+
+    def test_length(self):
+        with self.assertRaises(ValueError):
+            generate_recovery_codes(count=2, length=6)
@@ -1,9 +1,10 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from fastapi import FastAPI
 from starlette.testclient import TestClient
 
-from piccolo_api.openapi.endpoints import swagger_ui
+from piccolo_api.openapi.endpoints import ENVIRONMENT, swagger_ui
 
 
 class TestSwaggerUI(TestCase):
@@ -22,3 +23,51 @@ class TestSwaggerUI(TestCase):
 
         response = client.get("/docs/oauth2-redirect/")
         self.assertEqual(response.status_code, 200)
+
+    def test_template_rendered_once(self):
+        """
+        The HTML is the same for every request, so the template should only
+        be rendered once, when the endpoint is created.
+        """
+        with patch.object(
+            ENVIRONMENT, "get_template", wraps=ENVIRONMENT.get_template
+        ) as get_template:
+            client = TestClient(swagger_ui())
+
+            response_1 = client.get("/")
+            response_2 = client.get("/")
+
+        self.assertEqual(get_template.call_count, 1)
+        self.assertEqual(response_1.content, response_2.content)
+        self.assertEqual(
+            response_1.headers["content-type"], "text/html; charset=utf-8"
+        )
+
+    def test_asset_urls(self):
+        """
+        Make sure the Swagger UI assets are loaded from a CDN by default, but
+        can be overridden.
+        """
+        client = TestClient(swagger_ui(swagger_ui_version="5.1.0"))
+        html = client.get("/").text
+        self.assertIn(
+            "https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.1.0/"
+            "swagger-ui-bundle.js",
+            html,
+        )
+        self.assertIn(
+            "https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.1.0/"
+            "swagger-ui.css",
+            html,
+        )
+
+        client = TestClient(
+            swagger_ui(
+                swagger_js_url="/static/swagger-ui-bundle.js",
+                swagger_css_url="/static/swagger-ui.css",
+            )
+        )
+        html = client.get("/").text
+        self.assertIn('src="/static/swagger-ui-bundle.js"', html)
+        self.assertIn('href="/static/swagger-ui.css"', html)
+        self.assertNotIn("swagger-ui-dist", html)
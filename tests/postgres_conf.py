@@ -2,12 +2,24 @@ import os
 
 from piccolo.engine.postgres import PostgresEngine
 
+# When running the tests in parallel using pytest-xdist, give each worker its
+# own database, so they don't interfere with each other. See
+# ``tests/conftest.py``, which creates these databases.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+
+DATABASE = os.environ.get("PG_DATABASE", "piccolo_api")
+
+# We deliberately don't start a connection pool here. An asyncpg pool is bound
+# to the event loop it was created in, and most of the tests use ``run_sync``
+# or ``asyncio.run``, which create a new event loop each time - a pool created
+# at import time would be unusable from them.
+
 DB = PostgresEngine(
     config={
         "host": os.environ.get("PG_HOST", "localhost"),
         "port": os.environ.get("PG_PORT", "5432"),
         "user": os.environ.get("PG_USER", "postgres"),
         "password": os.environ.get("PG_PASSWORD", ""),
-        "database": os.environ.get("PG_DATABASE", "piccolo_api"),
+        "database": f"{DATABASE}_{WORKER}" if WORKER else DATABASE,
     }
 )
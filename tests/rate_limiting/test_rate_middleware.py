@@ -1,6 +1,6 @@
 import asyncio
-from time import sleep
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from httpx import ASGITransport, AsyncClient
 from starlette.endpoints import HTTPEndpoint
@@ -8,10 +8,15 @@ from starlette.responses import JSONResponse
 from starlette.routing import Route, Router
 
 from piccolo_api.rate_limiting.middleware import (
+    BucketedInMemoryLimitProvider,
     InMemoryLimitProvider,
+    RateLimitError,
     RateLimitingMiddleware,
 )
 
+# The client host which `httpx.ASGITransport` sends by default.
+CLIENT_HOST = "127.0.0.1"
+
 
 class Endpoint(HTTPEndpoint):
     async def get(self, request):
@@ -19,59 +24,194 @@ class Endpoint(HTTPEndpoint):
 
 
 class TestMiddleware(TestCase):
-    def test_limit(self):
+    """
+    Rather than sleeping until the ``timespan`` / ``block_duration`` windows
+    elapse, we patch the clock used by ``InMemoryLimitProvider``, and advance
+    it manually.
+    """
+
+    @patch("piccolo_api.rate_limiting.middleware.monotonic")
+    def test_limit(self, monotonic: MagicMock):
         """
         Make sure a request is rejected if the client has exceeded the limit.
         """
-        app = RateLimitingMiddleware(
-            Router([Route("/", Endpoint)]),
-            InMemoryLimitProvider(limit=5, timespan=1, block_duration=1),
-        )
+        monotonic.return_value = 1000.0
 
-        # We have to use `httpx.AsyncClient` directly, because `TestClient`
-        # was broken in this PR:
-        # https://github.com/encode/starlette/pull/2377
-        # `TestClient` no longer sends the client IP and port.
-        # If a fix is released, we can go back to using `TestClient` directly.
-        client = AsyncClient(
-            transport=ASGITransport(app=app),
-            base_url="http://testserver",
-        )
+        provider = InMemoryLimitProvider(limit=5, timespan=1, block_duration=1)
+        app = RateLimitingMiddleware(Router([Route("/", Endpoint)]), provider)
+
+        # Use up all but one of the allowed requests - we only need to check
+        # the boundary via HTTP. The counting itself is covered by
+        # `TestInMemoryLimitProvider`.
+        for _ in range(4):
+            provider.increment(CLIENT_HOST)
 
         async def run_test():
-            successful = 0
-            for _ in range(20):
+            # We have to use `httpx.AsyncClient` directly, because
+            # `TestClient` was broken in this PR:
+            # https://github.com/encode/starlette/pull/2377
+            # `TestClient` no longer sends the client IP and port.
+            # If a fix is released, we can go back to using `TestClient`
+            # directly.
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://testserver",
+            ) as client:
+                # The last allowed request.
                 response = await client.get("/")
-                if response.status_code == 429:
-                    break
-                else:
-                    successful += 1
+                self.assertEqual(response.status_code, 200)
+
+                # The limit has now been exceeded.
+                response = await client.get("/")
+                self.assertEqual(response.status_code, 429)
+
+                # After the 'block_duration' has expired, requests should be
+                # allowed again.
+                monotonic.return_value += 1.1
+                response = await client.get("/")
+                self.assertEqual(response.status_code, 200)
+
+        asyncio.run(run_test())
+
+    def test_concurrent_requests(self):
+        """
+        Make sure the limit is still enforced when a client sends a burst of
+        requests concurrently.
+        """
+        app = RateLimitingMiddleware(
+            Router([Route("/", Endpoint)]),
+            InMemoryLimitProvider(limit=5, timespan=300),
+        )
 
-            self.assertEqual(successful, 5)
+        async def run_test():
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://testserver",
+            ) as client:
+                responses = await asyncio.gather(
+                    *[client.get("/") for _ in range(20)]
+                )
 
-            # After the 'block_duration' has expired, requests should be
-            # allowed again.
-            sleep(1.1)
-            response = await client.get("/")
-            self.assertEqual(response.status_code, 200)
+            status_codes = [response.status_code for response in responses]
+            self.assertEqual(status_codes.count(200), 5)
+            self.assertEqual(status_codes.count(429), 15)
 
         asyncio.run(run_test())
 
-    def test_memory_usage(self):
+    @patch("piccolo_api.rate_limiting.middleware.monotonic")
+    def test_memory_usage(self, monotonic: MagicMock):
         """
         Make sure the memory used doesn't continue to increase over time (it
         should reset regularly at intervals of 'timespan' seconds).
         """
+        monotonic.return_value = 1000.0
+
         provider = InMemoryLimitProvider(
             limit=10, timespan=1, block_duration=1
         )
-        for i in range(100):
-            provider.increment(str(i))
 
-        self.assertEqual(len(provider.request_dict.keys()), 100)
+        # Simulate lots of clients having made requests.
+        provider.request_dict.update({str(i): 1 for i in range(100)})
 
-        sleep(1)
+        monotonic.return_value += 1.1
 
         # This should cause a reset, as the timespan has elapsed:
         provider.increment("1234")
         self.assertEqual(len(provider.request_dict.keys()), 1)
+
+
+class TestInMemoryLimitProvider(TestCase):
+    @patch("piccolo_api.rate_limiting.middleware.monotonic")
+    def test_limit(self, monotonic: MagicMock):
+        """
+        Make sure the client is blocked once they exceed the limit, and other
+        clients are unaffected.
+        """
+        monotonic.return_value = 1000.0
+
+        provider = InMemoryLimitProvider(limit=5, timespan=1, block_duration=1)
+
+        for _ in range(5):
+            provider.increment("a")
+
+        with self.assertRaises(RateLimitError):
+            provider.increment("a")
+
+        # The client stays blocked until `block_duration` has elapsed.
+        with self.assertRaises(RateLimitError):
+            provider.increment("a")
+
+        provider.increment("b")
+
+        monotonic.return_value += 1.1
+        provider.increment("a")
+
+
+class TestBucketedInMemoryLimitProvider(TestCase):
+    @patch("piccolo_api.rate_limiting.middleware.monotonic")
+    def test_limit(self, monotonic: MagicMock):
+        monotonic.return_value = 1000.0
+
+        provider = BucketedInMemoryLimitProvider(
+            limit=5, timespan=1, block_duration=1
+        )
+
+        for _ in range(5):
+            provider.increment("a")
+
+        with self.assertRaises(RateLimitError):
+            provider.increment("a")
+
+        monotonic.return_value += 1.1
+        provider.increment("a")
+
+    @patch("piccolo_api.rate_limiting.middleware.monotonic")
+    def test_memory_usage(self, monotonic: MagicMock):
+        """
+        The memory used is fixed, no matter how many clients there are, and
+        the counts are reset once the timespan has elapsed.
+        """
+        monotonic.return_value = 1000.0
+
+        provider = BucketedInMemoryLimitProvider(
+            limit=10, timespan=1, bucket_count=1024
+        )
+
+        for i in range(100):
+            provider.increment(str(i))
+
+        self.assertEqual(len(provider.buckets), 1024)
+        self.assertEqual(sum(provider.buckets), 100)
+
+        monotonic.return_value += 1.1
+
+        provider.increment("1234")
+        self.assertEqual(len(provider.buckets), 1024)
+        self.assertEqual(sum(provider.buckets), 1)
+
+    @patch("piccolo_api.rate_limiting.middleware.monotonic")
+    def test_blocked_bounded(self, monotonic: MagicMock):
+        """
+        Blocks are recorded per bucket, so the block list can't grow beyond
+        the number of buckets, no matter how many clients are blocked.
+        """
+        monotonic.return_value = 1000.0
+
+        provider = BucketedInMemoryLimitProvider(
+            limit=1, timespan=1, bucket_count=16
+        )
+
+        for i in range(1000):
+            identifier = str(i)
+            try:
+                provider.increment(identifier)
+                provider.increment(identifier)
+            except RateLimitError:
+                pass
+
+        self.assertLessEqual(len(provider.blocked), 16)
+        self.assertTrue(provider.is_already_blocked("0"))
+
+    def test_bucket_count(self):
+        with self.assertRaises(ValueError):
+            BucketedInMemoryLimitProvider(timespan=1, bucket_count=1000)
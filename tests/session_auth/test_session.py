@@ -1,8 +1,12 @@
 import datetime
+import functools
 import os
+import typing as t
 from unittest import TestCase
+from unittest.mock import patch
 
 from piccolo.apps.user.tables import BaseUser
+from piccolo.table import create_db_tables_sync, drop_db_tables_sync
 from piccolo.utils.sync import run_sync
 from starlette.authentication import requires
 from starlette.endpoints import HTTPEndpoint
@@ -11,10 +15,12 @@ from starlette.middleware.exceptions import ExceptionMiddleware
 from starlette.responses import JSONResponse, PlainTextResponse
 from starlette.routing import Mount, Route, Router
 from starlette.testclient import TestClient
+from starlette.types import ASGIApp
 
 from piccolo_api.change_password.endpoints import change_password
 from piccolo_api.register.endpoints import register
-from piccolo_api.session_auth.commands import clean
+from piccolo_api.session_auth.cache import evict_cached_sessions
+from piccolo_api.session_auth.commands import clean_sync
 from piccolo_api.session_auth.endpoints import session_login, session_logout
 from piccolo_api.session_auth.middleware import (
     SessionsAuthBackend,
@@ -22,25 +28,53 @@ from piccolo_api.session_auth.middleware import (
 )
 from piccolo_api.session_auth.tables import SessionsBase
 from piccolo_api.shared.auth.hooks import LoginHooks
+from tests.base import clear_db_tables_sync
 
 ###############################################################################
 
+# These tests don't need secure password hashes - a single PBKDF2 iteration
+# avoids the hashing cost whenever a user is saved, or logs in.
+_hash_patcher = patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
+
+
+def setUpModule():
+    _hash_patcher.start()
+
+
+def tearDownModule():
+    _hash_patcher.stop()
+
+
+###############################################################################
+
+
+# Looked up once, rather than on every request to HomeEndpoint.
+USER_PRIMARY_KEY = BaseUser._meta.primary_key
+
 
 class HomeEndpoint(HTTPEndpoint):
     def get(self, request):
-        data = (
-            SessionsBase.select(SessionsBase.user_id)
-            .where(SessionsBase.token == request.cookies.get("id"))
+        token = request.cookies.get("id")
+
+        # Tokens which are missing, or too long to be stored, can't match a
+        # session, so don't bother querying the database.
+        if not token or len(token) > SessionsBase.token.length:
+            return PlainTextResponse("hello world")
+
+        # A single query, using a sub select to find the session's user.
+        session_user = (
+            BaseUser.select(BaseUser.username)
+            .where(
+                USER_PRIMARY_KEY.is_in(
+                    SessionsBase.select(SessionsBase.user_id).where(
+                        SessionsBase.token == token
+                    )
+                )
+            )
             .first()
             .run_sync()
         )
-        if data:
-            session_user = (
-                BaseUser.select(BaseUser.username)
-                .where(BaseUser._meta.primary_key == data["user_id"])
-                .first()
-                .run_sync()
-            )
+        if session_user:
             return PlainTextResponse(f"hello {session_user['username']}")
         else:
             return PlainTextResponse("hello world")
@@ -91,6 +125,21 @@ ROUTER = Router(
 APP = ExceptionMiddleware(ROUTER)
 
 
+@functools.lru_cache(maxsize=None)
+def login_app(template_path: str) -> ExceptionMiddleware:
+    """
+    An app with just a login endpoint, using a custom template. It's cached,
+    so the app is only built once per template.
+    """
+    return ExceptionMiddleware(
+        Router(
+            routes=[
+                Route("/login/", session_login(template_path=template_path)),
+            ]
+        )
+    )
+
+
 ###############################################################################
 
 
@@ -104,13 +153,77 @@ class SessionTestCase(TestCase):
         "confirm_password": "john123",
     }
 
+    tables = [SessionsBase, BaseUser]
+    app: ASGIApp = APP
+    client: TestClient
+    user_credentials: t.Dict[str, str]
+
+    # The tables and the test client are only created once per class -
+    # between tests we just remove the rows, and any cookies. The client is
+    # entered as a context manager, so all of its requests share a single
+    # event loop, instead of starting a new one for each request.
+
+    @classmethod
+    def setUpClass(cls):
+        create_db_tables_sync(*cls.tables)
+
+        # The password is hashed once here, rather than each time a user is
+        # created.
+        cls.user_credentials = {
+            "username": cls.credentials["username"],
+            "password": BaseUser.hash_password(cls.credentials["password"]),
+        }
+        cls.client = TestClient(cls.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        drop_db_tables_sync(*cls.tables)
+
     def setUp(self):
-        SessionsBase.create_table().run_sync()
-        BaseUser.create_table().run_sync()
+        self.client.cookies.clear()
+
+    def create_user(
+        self, active: bool = True, admin: bool = True, superuser: bool = True
+    ) -> BaseUser:
+        user = BaseUser(
+            **self.user_credentials,
+            active=active,
+            admin=admin,
+            superuser=superuser,
+        )
+        user.save().run_sync()
+        return user
+
+    def create_user_and_session(self) -> str:
+        """
+        Creates a user, and a session for them, and returns the session token.
+        Both queries are run in a single event loop.
+        """
+
+        async def create() -> str:
+            user = BaseUser(
+                **self.user_credentials,
+                active=True,
+                admin=True,
+                superuser=True,
+            )
+            await user.save()
+            session = await SessionsBase.create_session(user_id=user.id)
+            return t.cast(str, session.token)
+
+        return run_sync(create())
+
+    def login_as(self, user: BaseUser) -> str:
+        """
+        Creates a session for the user directly, rather than going via the
+        login endpoint, and returns the session token.
+        """
+        return SessionsBase.create_session_sync(user_id=user.id).token
 
     def tearDown(self):
-        SessionsBase.alter().drop_table().run_sync()
-        BaseUser.alter().drop_table().run_sync()
+        clear_db_tables_sync(*self.tables)
 
 
 class TestSessions(SessionTestCase):
@@ -123,11 +236,69 @@ class TestSessions(SessionTestCase):
             SessionsBase.select("user_id").run_sync(), [{"user_id": 1}]
         )
 
+    def test_create_sessions(self):
+        """
+        Make sure several sessions can be created at once.
+        """
+        user_ids = list(range(1, 101))
+        sessions = SessionsBase.create_sessions_sync(user_ids=user_ids)
+
+        self.assertEqual(len({session.token for session in sessions}), 100)
+        self.assertEqual(
+            SessionsBase.select("user_id")
+            .order_by(SessionsBase.user_id)
+            .output(as_list=True)
+            .run_sync(),
+            user_ids,
+        )
+        for session in (sessions[0], sessions[-1]):
+            self.assertEqual(
+                SessionsBase.get_user_id_sync(session.token),
+                session.user_id,
+            )
+
+        self.assertEqual(SessionsBase.create_sessions_sync(user_ids=[]), [])
+
+    def test_create_sessions_expiry(self):
+        """
+        Make sure the expiry dates are passed through.
+        """
+        expiry_date = datetime.datetime(2030, 1, 1)
+        max_expiry_date = datetime.datetime(2030, 1, 2)
+
+        SessionsBase.create_sessions_sync(
+            user_ids=[1, 2],
+            expiry_date=expiry_date,
+            max_expiry_date=max_expiry_date,
+        )
+
+        self.assertEqual(
+            SessionsBase.select(
+                SessionsBase.expiry_date, SessionsBase.max_expiry_date
+            ).run_sync(),
+            [
+                {
+                    "expiry_date": expiry_date,
+                    "max_expiry_date": max_expiry_date,
+                }
+            ]
+            * 2,
+        )
+
+    def test_indexes(self):
+        """
+        Sessions are looked up by token on every request, and removed by
+        expiry date, so make sure both columns are indexed.
+        """
+        indexes = SessionsBase.indexes().run_sync()
+        self.assertIn("sessions_token", indexes)
+        self.assertIn("sessions_expiry_date", indexes)
+
     def test_default_register_template(self):
         """
         Make sure the default register template works.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.get("/register/")
         self.assertIn(b"<h1>Sign Up</h1>", response.content)
 
@@ -135,14 +306,14 @@ class TestSessions(SessionTestCase):
         """
         Make sure to create a user and attempt to log in user.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.post(
             "/register/",
             json=self.register_credentials,
             follow_redirects=False,
         )
         self.assertEqual(response.status_code, 303)
-        self.assertEqual([i for i in response.cookies.keys()], [])
+        self.assertFalse(response.cookies)
 
         response = client.post(
             "/login/",
@@ -153,77 +324,49 @@ class TestSessions(SessionTestCase):
             follow_redirects=False,
         )
         self.assertEqual(response.status_code, 303)
-        self.assertEqual([i for i in response.cookies.keys()], ["id"])
+        self.assertEqual(list(response.cookies.keys()), ["id"])
 
-    def test_register_missing_fields(self):
+    def test_register_validation(self):
         """
-        Make sure all fields on the form are filled out.
+        Make sure invalid registrations are rejected.
         """
-        client = TestClient(APP)
-        response = client.post("/register/", json={})
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(
-            response.content, b"Form is invalid. Missing one or more fields."
-        )
+        client = self.client
 
-    def test_register_correct_email(self):
-        """
-        Make sure the email is valid.
-        """
-        client = TestClient(APP)
-        response = client.post(
-            "/register/",
-            json={
-                "username": "John",
-                "email": "john@",
-                "password": "john123",
-                "confirm_password": "john123",
-            },
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(response.content, b"Invalid email address.")
-
-    def test_register_password_length(self):
-        """
-        Make sure the password is at least 6 characters long.
-        """
-        client = TestClient(APP)
-        response = client.post(
-            "/register/",
-            json={
-                "username": "John",
-                "email": "john@example.com",
-                "password": "john",
-                "confirm_password": "john",
-            },
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(
-            response.content, b"Password must be at least 6 characters long."
-        )
+        for payload, content in [
+            # All fields on the form must be filled out.
+            ({}, b"Form is invalid. Missing one or more fields."),
+            # The email must be valid.
+            (
+                {**self.register_credentials, "email": "john@"},
+                b"Invalid email address.",
+            ),
+            # The password must be at least 6 characters long.
+            (
+                {
+                    **self.register_credentials,
+                    "password": "john",
+                    "confirm_password": "john",
+                },
+                b"Password must be at least 6 characters long.",
+            ),
+            # The passwords must match.
+            (
+                {**self.register_credentials, "confirm_password": "john"},
+                b"Passwords do not match.",
+            ),
+        ]:
+            with self.subTest(content=content):
+                response = client.post("/register/", json=payload)
+                self.assertEqual(response.status_code, 422)
+                self.assertEqual(response.content, content)
 
-    def test_register_password_match(self):
-        """
-        Make sure the passwords match.
-        """
-        client = TestClient(APP)
-        response = client.post(
-            "/register/",
-            json={
-                "username": "John",
-                "email": "john@example.com",
-                "password": "john123",
-                "confirm_password": "john",
-            },
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(response.content, b"Passwords do not match.")
+        self.assertEqual(BaseUser.count().run_sync(), 0)
 
     def test_register_user_already_exist(self):
         """
         Check that a user who already exists cannot register.
         """
-        client = TestClient(APP)
+        client = self.client
         BaseUser(
             username="John", email="john@example.com", password="john123"
         ).save().run_sync()
@@ -237,10 +380,8 @@ class TestSessions(SessionTestCase):
         """
         Make sure a user can't login using wrong credentials.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
+        client = self.client
+        self.create_user()
 
         # Test with the wrong username and password.
         response = client.post(
@@ -248,7 +389,7 @@ class TestSessions(SessionTestCase):
             json=self.wrong_credentials,
         )
         self.assertEqual(response.status_code, 401)
-        self.assertEqual([i for i in response.cookies.values()], [])
+        self.assertFalse(response.cookies)
 
         # Test with the correct username, but wrong password.
         response = client.post(
@@ -259,32 +400,13 @@ class TestSessions(SessionTestCase):
             },
         )
         self.assertEqual(response.status_code, 401)
-        self.assertEqual([i for i in response.cookies.values()], [])
-
-    def test_login_success(self):
-        """
-        Make sure a user with the correct permissions can access the protected
-        endpoint.
-        """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-        self.assertEqual(response.status_code, 303)
-        self.assertIn("id", response.cookies.keys())
-
-        response = client.get("/secret/")
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.content, b"top secret")
+        self.assertFalse(response.cookies)
 
     def test_no_cookie(self):
         """
         Make sure a user with no cookie can't access the protected endpoint.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.get("/secret/")
         self.assertEqual(response.content, b"No session cookie found.")
         self.assertEqual(response.status_code, 400)
@@ -294,76 +416,96 @@ class TestSessions(SessionTestCase):
         Make sure a user with a cookie, but containing an incorrect session id
         can't access the protected endpoint.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.get("/secret/", cookies={"id": "abc123"})
         self.assertEqual(response.content, b"No matching session found.")
         self.assertEqual(response.status_code, 400)
 
-    def test_inactive_user(self):
+    def test_login_success(self):
         """
-        Inactive users should be rejected by the middleware, if configured
-        that way.
+        Make sure a user with the correct permissions can login, and access
+        the protected endpoint.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=False, admin=True, superuser=True
-        ).save().run_sync()
+        client = self.client
+        self.create_user()
         response = client.post(
             "/login/", json=self.credentials, follow_redirects=False
         )
-
-        # Currently the login is successful if the user is inactive - this
-        # should change in the future.
         self.assertEqual(response.status_code, 303)
+        self.assertIn("id", response.cookies.keys())
 
-        # Make a request using the session - it should get rejected.
         response = client.get("/secret/")
-        self.assertEqual(response.status_code, 400)
-        self.assertEqual(response.content, b"Active users only")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"top secret")
 
-    def test_non_superuser(self):
+    def test_home(self):
         """
-        Non-superusers should by rejected by the middleware, if configured
-        that way.
+        Make sure the home page greets the user whose session cookie is sent,
+        and falls back to a generic greeting otherwise.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=False
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-        self.assertEqual(response.status_code, 303)
+        client = self.client
+        token = self.login_as(self.create_user())
 
-        # Make a request using the session - it should get rejected.
-        response = client.get("/secret/")
-        self.assertEqual(response.status_code, 400)
-        self.assertEqual(response.content, b"Superusers only")
+        for cookies, expected in (
+            ({}, b"hello world"),
+            ({"id": "abc123"}, b"hello world"),
+            ({"id": "a" * (SessionsBase.token.length + 1)}, b"hello world"),
+            ({"id": token}, b"hello Bob"),
+        ):
+            with self.subTest(cookies=cookies):
+                client.cookies.clear()
+                client.cookies.update(cookies)
+                response = client.get("/")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.content, expected)
 
-    def test_non_admin(self):
+    def test_permission_matrix(self):
         """
-        Non-admin users should be rejected by the middleware, if configured
-        that way.
+        Users without the required permissions can still log in, but should
+        be rejected by the middleware, if configured that way.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=False, superuser=False
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-        self.assertEqual(response.status_code, 303)
+        client = self.client
 
-        # Make a request using the session - it should get rejected.
-        response = client.get("/secret/")
-        self.assertEqual(response.status_code, 400)
-        self.assertEqual(response.content, b"Admin users only")
+        for flags, content in [
+            # Inactive users
+            (
+                {"active": False, "admin": True, "superuser": True},
+                b"Active users only",
+            ),
+            # Non-superusers
+            (
+                {"active": True, "admin": True, "superuser": False},
+                b"Superusers only",
+            ),
+            # Non-admins
+            (
+                {"active": True, "admin": False, "superuser": False},
+                b"Admin users only",
+            ),
+        ]:
+            with self.subTest(flags=flags):
+                clear_db_tables_sync(*self.tables)
+                client.cookies.clear()
+                self.create_user(**flags)
+
+                response = client.post(
+                    "/login/", json=self.credentials, follow_redirects=False
+                )
+
+                # Currently the login is successful if the user is inactive -
+                # this should change in the future.
+                self.assertEqual(response.status_code, 303)
+
+                # Make a request using the session - it should get rejected.
+                response = client.get("/secret/")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.content, content)
 
     def test_default_login_template(self):
         """
         Make sure the default login template works.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.get("/login/")
         self.assertIn(b"<h1>Login</h1>", response.content)
 
@@ -377,16 +519,7 @@ class TestSessions(SessionTestCase):
             "simple_login_template",
             "login.html",
         )
-        router = Router(
-            routes=[
-                Route(
-                    "/login/",
-                    session_login(template_path=template_path),
-                ),
-            ]
-        )
-        app = ExceptionMiddleware(router)
-        client = TestClient(app)
+        client = TestClient(login_app(template_path=template_path))
         response = client.get("/login/")
         self.assertEqual(response.content, b"<p>Hello world</p>")
 
@@ -401,16 +534,7 @@ class TestSessions(SessionTestCase):
             "complex_login_template",
             "login.html",
         )
-        router = Router(
-            routes=[
-                Route(
-                    "/login/",
-                    session_login(template_path=template_path),
-                ),
-            ]
-        )
-        app = ExceptionMiddleware(router)
-        client = TestClient(app)
+        client = TestClient(login_app(template_path=template_path))
         response = client.get("/login/")
         self.assertEqual(response.content, b"<p>Hello world</p>")
 
@@ -419,32 +543,19 @@ class TestSessions(SessionTestCase):
         Make sure a POST request sent to `session_logout` will log out the
         user.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
+        client = self.client
+        client.cookies["id"] = self.login_as(self.create_user())
 
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-        self.assertEqual(response.status_code, 303)
-        self.assertIn("id", response.cookies.keys())
-
-        client = TestClient(APP)
-
-        response = client.post(
-            "/logout/",
-            cookies={"id": response.cookies["id"]},
-            json=self.credentials,
-        )
+        response = client.post("/logout/", json=self.credentials)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content, b"Successfully logged out")
+        self.assertFalse(SessionsBase.exists().run_sync())
 
     def test_logout_get_template(self):
         """
         Make sure a GET request to `session_logout` returns a logout form.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.get("/logout/")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
@@ -457,19 +568,10 @@ class TestSessions(SessionTestCase):
         Make sure a GET request to `change_password` returns a change
         password form.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
+        client = self.client
+        client.cookies["id"] = self.login_as(self.create_user())
 
-        client = TestClient(APP)
-        response = client.get(
-            "/change-password/",
-            cookies={"id": response.cookies["id"]},
-        )
+        response = client.get("/change-password/")
         self.assertEqual(response.status_code, 200)
         self.assertEqual(
             response.headers["content-type"], "text/html; charset=utf-8"
@@ -480,17 +582,11 @@ class TestSessions(SessionTestCase):
         """
         Make sure a POST request to `change_password` works.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
+        client = self.client
+        client.cookies["id"] = self.login_as(self.create_user())
 
         response = client.post(
             "/change-password/",
-            cookies={"id": response.cookies["id"]},
             json={
                 "current_password": self.credentials["password"],
                 "new_password": "newpass123",
@@ -501,46 +597,60 @@ class TestSessions(SessionTestCase):
         self.assertEqual(response.status_code, 303)
         self.assertEqual(response.headers["location"], "/login/")
 
-    def test_wrong_current_password(self):
+    def test_change_password_validation(self):
         """
-        Make sure a POST request to `change_password` works.
+        Make sure invalid password changes are rejected.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
+        client = self.client
+        client.cookies["id"] = self.login_as(self.create_user())
 
-        client = TestClient(APP)
-        response = client.post(
-            "/change-password/",
-            cookies={"id": response.cookies["id"]},
-            json={
-                "current_password": "bob1234",
-                "new_password": "newpass123",
-                "confirm_new_password": "newpass123",
-            },
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(response.content, b"Incorrect password.")
+        current_password = self.credentials["password"]
+
+        for payload, content in [
+            # The current password must be correct.
+            (
+                {
+                    "current_password": "bob1234",
+                    "new_password": "newpass123",
+                    "confirm_new_password": "newpass123",
+                },
+                b"Incorrect password.",
+            ),
+            # All fields on the form must be filled out.
+            ({}, b"Form is invalid. Missing one or more fields."),
+            # The password must be at least 6 characters long.
+            (
+                {
+                    "current_password": current_password,
+                    "new_password": "john",
+                    "confirm_new_password": "john123",
+                },
+                b"Password must be at least 6 characters long.",
+            ),
+            # The passwords must match.
+            (
+                {
+                    "current_password": current_password,
+                    "new_password": "john123",
+                    "confirm_new_password": "john1234",
+                },
+                b"Passwords do not match.",
+            ),
+        ]:
+            with self.subTest(content=content):
+                response = client.post("/change-password/", json=payload)
+                self.assertEqual(response.status_code, 422)
+                self.assertEqual(response.content, content)
 
     def test_change_password_success(self):
         """
         Make sure a POST request to `change_password` works.
         """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
+        client = self.client
+        client.cookies["id"] = self.login_as(self.create_user())
 
         response = client.post(
             "/change-password/",
-            cookies={"id": response.cookies["id"]},
             json={
                 "current_password": self.credentials["password"],
                 "new_password": "newpass123",
@@ -552,86 +662,11 @@ class TestSessions(SessionTestCase):
         self.assertEqual(response.headers["location"], "/login/")
         self.assertNotIn("id", response.cookies.keys())
 
-    def test_change_password_missing_fields(self):
-        """
-        Make sure all fields on the form are filled out.
-        """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-
-        client = TestClient(APP)
-        response = client.post(
-            "/change-password/",
-            cookies={"id": response.cookies["id"]},
-            json={},
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(
-            response.content, b"Form is invalid. Missing one or more fields."
-        )
-
-    def test_change_password_length(self):
-        """
-        Make sure the password is at least 6 characters long.
-        """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-
-        client = TestClient(APP)
-        response = client.post(
-            "/change-password/",
-            cookies={"id": response.cookies["id"]},
-            json={
-                "current_password": self.credentials["password"],
-                "new_password": "john",
-                "confirm_new_password": "john123",
-            },
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(
-            response.content, b"Password must be at least 6 characters long."
-        )
-
-    def test_change_password_match(self):
-        """
-        Make sure that passwords have to match.
-        """
-        client = TestClient(APP)
-        BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        ).save().run_sync()
-        response = client.post(
-            "/login/", json=self.credentials, follow_redirects=False
-        )
-
-        client = TestClient(APP)
-        response = client.post(
-            "/change-password/",
-            cookies={"id": response.cookies["id"]},
-            json={
-                "current_password": self.credentials["password"],
-                "new_password": "john123",
-                "confirm_new_password": "john1234",
-            },
-        )
-        self.assertEqual(response.status_code, 422)
-        self.assertEqual(response.content, b"Passwords do not match.")
-
     def test_change_password_not_authenticated(self):
         """
         Make sure that unauthenticated users can't change their password.
         """
-        client = TestClient(APP)
+        client = self.client
         response = client.get("/change-password/")
         self.assertEqual(response.status_code, 400)
         self.assertIn(b"No session cookie found.", response.content)
@@ -656,28 +691,18 @@ class TestAllowUnauthenticated(SessionTestCase):
     allows the request to continue.
     """
 
-    def create_user_and_session(self):
-        user = BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        )
-        user.save().run_sync()
-        SessionsBase.create_session_sync(user_id=user.id)
-
-    def setUp(self):
-        super().setUp()
-
-        # Add a session to the database to make it more realistic.
-        self.create_user_and_session()
+    # Wrapped in a router, so the shared client's lifespan events are
+    # handled.
+    app = AuthenticationMiddleware(
+        Router(routes=[Route("/", EchoEndpoint)]),
+        SessionsAuthBackend(allow_unauthenticated=True),
+    )
 
     def test_no_cookie(self):
         """
         Make sure it works when there is no cookie with the correct name.
         """
-        app = AuthenticationMiddleware(
-            EchoEndpoint,
-            SessionsAuthBackend(allow_unauthenticated=True),
-        )
-        client = TestClient(app)
+        client = self.client
 
         # Test it with no cookie set
         response = client.get("/")
@@ -692,11 +717,11 @@ class TestAllowUnauthenticated(SessionTestCase):
         Make sure it works when there is a cookie with the correct name, but
         an incorrect value.
         """
-        app = AuthenticationMiddleware(
-            EchoEndpoint,
-            SessionsAuthBackend(allow_unauthenticated=True),
-        )
-        client = TestClient(app)
+        client = self.client
+
+        # Add a session to the database, so there's a valid token which
+        # doesn't match.
+        self.create_user_and_session()
 
         # Test it with a cookie set, but containing an incorrect token.
         response = client.get("/", cookies={"id": "abc123"})
@@ -707,6 +732,139 @@ class TestAllowUnauthenticated(SessionTestCase):
         )
 
 
+class TestSessionCache(SessionTestCase):
+    """
+    Make sure the session lookup is cached, if `session_cache_ttl` is set.
+    """
+
+    backend = SessionsAuthBackend(
+        session_cache_ttl=60, excluded_paths=["/login/"]
+    )
+    app = ExceptionMiddleware(
+        AuthenticationMiddleware(
+            Router(
+                routes=[
+                    Route("/", EchoEndpoint),
+                    Route("/login/", session_login(redirect_to=None)),
+                    Route("/logout/", session_logout()),
+                ]
+            ),
+            backend,
+        )
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.token = self.create_user_and_session()
+        self.client.cookies["id"] = self.token
+
+        get_user_id_patcher = patch.object(
+            SessionsBase, "get_user_id", side_effect=SessionsBase.get_user_id
+        )
+        self.get_user_id = get_user_id_patcher.start()
+        self.addCleanup(get_user_id_patcher.stop)
+
+        monotonic_patcher = patch(
+            "piccolo_api.session_auth.cache.monotonic", return_value=0
+        )
+        self.monotonic = monotonic_patcher.start()
+        self.addCleanup(monotonic_patcher.stop)
+
+    def tearDown(self):
+        super().tearDown()
+        self.backend._session_cache.clear()
+
+    def test_cached(self):
+        for _ in range(2):
+            response = self.client.get("/")
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()["is_authenticated"])
+
+        self.assertEqual(self.get_user_id.call_count, 1)
+
+    def test_expiry(self):
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+
+        # Once the cache entry expires, the session is looked up again - by
+        # which point it has been removed.
+        SessionsBase.remove_session_sync(token=self.token)
+        self.monotonic.return_value = 61
+
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b"No matching session found.")
+
+        self.assertEqual(self.get_user_id.call_count, 2)
+
+    def test_session_expires_while_cached(self):
+        """
+        Make sure a session isn't cached beyond its expiry date.
+        """
+        token = SessionsBase.create_session_sync(
+            user_id=SessionsBase.get_user_id_sync(self.token),
+            expiry_date=datetime.datetime.now()
+            + datetime.timedelta(seconds=5),
+        ).token
+        self.client.cookies["id"] = token
+
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+
+        # Simulate the session expiring, well within `session_cache_ttl`.
+        SessionsBase.update(
+            {SessionsBase.expiry_date: datetime.datetime.now()}
+        ).where(SessionsBase.token == token).run_sync()
+        self.monotonic.return_value = 6
+
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b"No matching session found.")
+
+    def test_logout(self):
+        """
+        Make sure that once a user logs out, their cached session can't be
+        used.
+        """
+        client = self.client
+        client.cookies.clear()
+
+        response = client.post("/login/", json=self.credentials)
+        self.assertEqual(response.status_code, 200)
+        token = client.cookies["id"]
+
+        response = client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_authenticated"])
+
+        response = client.post("/logout/")
+        self.assertEqual(response.status_code, 200)
+
+        # Reuse the old cookie.
+        client.cookies["id"] = token
+        response = client.get("/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b"No matching session found.")
+
+    def test_evict_user(self):
+        """
+        Make sure a user's cached sessions can be evicted, for example after
+        making them inactive.
+        """
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+
+        user_id = SessionsBase.get_user_id_sync(self.token)
+        BaseUser.update({BaseUser.active: False}).where(
+            BaseUser._meta.primary_key == user_id
+        ).run_sync()
+        evict_cached_sessions(user_id=user_id)
+
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b"Active users only")
+
+
 ###############################################################################
 
 EXCLUDED_PATHS_APP = Router(
@@ -738,13 +896,6 @@ class TestExcludedPaths(SessionTestCase):
     request to continue without a cookie.
     """
 
-    def create_user_and_session(self):
-        user = BaseUser(
-            **self.credentials, active=True, admin=True, superuser=True
-        )
-        user.save().run_sync()
-        SessionsBase.create_session_sync(user_id=user.id)
-
     def setUp(self):
         super().setUp()
 
@@ -851,24 +1002,39 @@ class TestHooks(SessionTestCase):
         )
         app = ExceptionMiddleware(router)
 
-        BaseUser(**self.credentials, active=True).save().run_sync()
+        self.create_user(admin=False, superuser=False)
 
         client = TestClient(app)
         client.post("/login/", json=self.credentials)
 
 
-class TestCleanSessions(TestCase):
-    def setUp(self):
-        SessionsBase.create_table().run_sync()
-
-    def tearDown(self):
-        SessionsBase.alter().drop_table().run_sync()
+class TestCleanSessions(SessionTestCase):
+    tables = [SessionsBase]
 
     def test_clean_sessions(self):
         SessionsBase.create_session_sync(
             user_id=1,
             expiry_date=datetime.datetime.now(),
         )
-        run_sync(clean())
+        clean_sync()
         session = SessionsBase.select().run_sync()
         self.assertEqual(session, [])
+
+    def test_clean_sessions_batched(self):
+        """
+        Make sure all of the expired sessions are removed, even when there are
+        more than the batch size, and valid sessions are left alone.
+        """
+        for _ in range(5):
+            SessionsBase.create_session_sync(
+                user_id=1,
+                expiry_date=datetime.datetime.now(),
+            )
+        session = SessionsBase.create_session_sync(user_id=1)
+
+        clean_sync(batch_size=2)
+
+        self.assertEqual(
+            SessionsBase.select(SessionsBase.token).run_sync(),
+            [{"token": session.token}],
+        )
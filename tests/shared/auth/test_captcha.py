@@ -1,17 +1,22 @@
-from unittest import TestCase
-
-from piccolo.utils.sync import run_sync
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
 
 from piccolo_api.shared.auth.captcha import (
+    _CLIENTS,
     HCAPTCHA_TEST_CREDENTIALS,
     RECAPTCHA_V2_TEST_CREDENTIALS,
+    _get_client,
+    aclose_clients,
     hcaptcha,
     recaptcha_v2,
 )
 
 
-class TestHcaptcha(TestCase):
-    def test_validator(self):
+class TestHcaptcha(IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        await aclose_clients()
+
+    async def test_validator(self):
         """
         Test calling the hCaptcha API with correct and incorrect tokens.
         """
@@ -20,20 +25,23 @@ class TestHcaptcha(TestCase):
             secret_key=HCAPTCHA_TEST_CREDENTIALS.secret_key,
         )
 
-        # Test correct token
-        response = run_sync(
-            captcha.validate(token=HCAPTCHA_TEST_CREDENTIALS.token)
+        incorrect_token = "10000000-aaaa-bbbb-cccc-100000000001"
+
+        # The validations are independent, so run them concurrently.
+        correct_response, incorrect_response = await asyncio.gather(
+            captcha.validate(token=HCAPTCHA_TEST_CREDENTIALS.token),
+            captcha.validate(token=incorrect_token),
         )
-        self.assertIs(response, None)
 
-        # Test incorrect token
-        incorrect_token = "10000000-aaaa-bbbb-cccc-100000000001"
-        response = run_sync(captcha.validate(token=incorrect_token))
-        self.assertEqual(response, "CAPTCHA failed.")
+        self.assertIs(correct_response, None)
+        self.assertEqual(incorrect_response, "CAPTCHA failed.")
 
 
-class TestRecaptchaV2(TestCase):
-    def test_validator(self):
+class TestRecaptchaV2(IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        await aclose_clients()
+
+    async def test_validator(self):
         """
         Test calling the reCAPTCHA API.
         """
@@ -43,7 +51,55 @@ class TestRecaptchaV2(TestCase):
         )
 
         # Any token works when we use the test site key and secret key.
-        response = run_sync(
-            captcha.validate(token=RECAPTCHA_V2_TEST_CREDENTIALS.token)
+        response = await captcha.validate(
+            token=RECAPTCHA_V2_TEST_CREDENTIALS.token
         )
         self.assertIs(response, None)
+
+
+class TestGetClient(TestCase):
+    def test_reused(self):
+        """
+        Make sure the same client is used for repeat validations, so its
+        connections can be reused.
+        """
+
+        async def get_clients():
+            clients = _get_client(), _get_client()
+            await aclose_clients()
+            return clients
+
+        first, second = asyncio.run(get_clients())
+        self.assertIs(first, second)
+
+    def test_per_event_loop(self):
+        """
+        A client can't be shared between event loops, so make sure each loop
+        gets its own.
+        """
+
+        async def get_client():
+            client = _get_client()
+            await aclose_clients()
+            return client
+
+        self.assertIsNot(asyncio.run(get_client()), asyncio.run(get_client()))
+
+    def test_aclose_clients(self):
+        """
+        Make sure the client for the running event loop is closed, and a new
+        one is created if needed afterwards.
+        """
+
+        async def close_client():
+            client = _get_client()
+            await aclose_clients()
+            self.assertTrue(client.is_closed)
+            self.assertNotIn(asyncio.get_running_loop(), _CLIENTS)
+
+            new_client = _get_client()
+            self.assertIsNot(new_client, client)
+            await aclose_clients()
+            self.assertTrue(new_client.is_closed)
+
+        asyncio.run(close_client())
@@ -0,0 +1,70 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from piccolo.utils.sync import run_sync
+from starlette.authentication import AuthenticationError
+from starlette.requests import HTTPConnection
+
+from piccolo_api.shared.auth.excluded_paths import ExcludedPathMatcher
+from piccolo_api.token_auth.middleware import (
+    SecretTokenAuthProvider,
+    TokenAuthBackend,
+)
+
+
+def get_connection(path: str) -> HTTPConnection:
+    return HTTPConnection(
+        {
+            "type": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "headers": [],
+        }
+    )
+
+
+class TestExcludedPathMatcher(TestCase):
+    def test_matches(self):
+        matcher = ExcludedPathMatcher(["/docs", "/path/*"])
+
+        for path, expected in (
+            ("/docs", True),
+            ("/docs/", False),
+            ("/path/", True),
+            ("/path/a/", True),
+            ("/other/", False),
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(
+                    matcher.matches(get_connection(path)), expected
+                )
+
+    def test_built_once(self):
+        """
+        Make sure the excluded paths are parsed when the backend is created,
+        rather than on each request.
+        """
+        backend = TokenAuthBackend(
+            SecretTokenAuthProvider(tokens=[]), excluded_paths=["/docs"]
+        )
+
+        with patch(
+            "piccolo_api.shared.auth.excluded_paths.ExcludedPathMatcher"
+        ) as matcher_class:
+            for _ in range(2):
+                _, user = run_sync(
+                    backend.authenticate(get_connection("/docs"))
+                )
+                self.assertFalse(user.is_authenticated)
+
+        matcher_class.assert_not_called()
+
+        # If the excluded paths are replaced, the matcher is rebuilt.
+        backend.excluded_paths = ["/other"]
+        with self.assertRaises(AuthenticationError):
+            run_sync(backend.authenticate(get_connection("/docs")))
+
+        # Likewise if they're changed in place.
+        backend.excluded_paths.append("/docs")
+        _, user = run_sync(backend.authenticate(get_connection("/docs")))
+        self.assertFalse(user.is_authenticated)
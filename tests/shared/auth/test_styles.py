@@ -1,7 +1,9 @@
+import asyncio
 from unittest import TestCase
 
+from httpx import ASGITransport, AsyncClient
+from piccolo.utils.sync import run_sync
 from starlette.routing import Route, Router
-from starlette.testclient import TestClient
 
 from piccolo_api.register.endpoints import register
 from piccolo_api.session_auth.endpoints import session_login, session_logout
@@ -30,8 +32,19 @@ class TestStyles(TestCase):
                 ),
             ]
         )
-        client = TestClient(app)
 
-        for url in ("/login/", "/logout/", "/register/"):
-            response = client.get(url)
+        async def get_responses():
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url="http://testserver",
+            ) as client:
+                # The requests are independent, so send them concurrently.
+                return await asyncio.gather(
+                    *[
+                        client.get(url)
+                        for url in ("/login/", "/logout/", "/register/")
+                    ]
+                )
+
+        for response in run_sync(get_responses()):
             self.assertIn(b"--background_color: black;", response.content)
@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+from piccolo_api.session_auth.endpoints import (
+    LOGIN_TEMPLATE_PATH,
+    LOGOUT_TEMPLATE_PATH,
+    session_login,
+)
+from piccolo_api.shared.templates import get_environment, get_template
+
+
+class TestGetTemplate(TestCase):
+    def test_environment_reused(self):
+        """
+        Make sure templates in the same directory share an environment.
+        """
+        self.assertIs(
+            get_template(LOGIN_TEMPLATE_PATH).environment,
+            get_template(LOGOUT_TEMPLATE_PATH).environment,
+        )
+
+    def test_template_reused(self):
+        """
+        Make sure the template is only compiled once, even when several
+        endpoints are created using it.
+        """
+        get_environment.cache_clear()
+
+        self.assertIs(
+            session_login()._login_template,
+            session_login()._login_template,
+        )
@@ -1,3 +1,15 @@
+import os
+
 from piccolo.engine.sqlite import SQLiteEngine
 
-DB = SQLiteEngine(path="piccolo_api_test.sqlite")
+# When running the tests in parallel using pytest-xdist, give each worker its
+# own database file, so they don't interfere with each other.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+
+DB = SQLiteEngine(
+    path=(
+        f"piccolo_api_test_{WORKER}.sqlite"
+        if WORKER
+        else "piccolo_api_test.sqlite"
+    )
+)
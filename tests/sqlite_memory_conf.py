@@ -0,0 +1,17 @@
+"""
+Runs the tests against an in-memory SQLite database, which avoids any disk
+I/O. When running with pytest-xdist, each worker is a separate process, so
+automatically gets its own database.
+"""
+
+import sqlite3
+
+from piccolo.engine.sqlite import SQLiteEngine
+
+PATH = "file:piccolo_api_test?mode=memory&cache=shared"
+
+# Piccolo opens a new connection for each query, and an in-memory database is
+# deleted once its last connection closes - so we keep one open.
+_CONNECTION = sqlite3.connect(PATH, uri=True, check_same_thread=False)
+
+DB = SQLiteEngine(path=PATH, uri=True)
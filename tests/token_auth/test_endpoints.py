@@ -1,6 +1,8 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from piccolo.apps.user.tables import BaseUser
+from piccolo.table import create_db_tables_sync, drop_db_tables_sync
 from starlette.routing import Route, Router
 from starlette.testclient import TestClient
 
@@ -13,16 +15,15 @@ APP = Router([Route("/", token_login())])
 ###############################################################################
 
 
+@patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
 class TestLoginEndpoint(TestCase):
     credentials = {"username": "Bob", "password": "bob123"}
 
     def setUp(self):
-        BaseUser.create_table().run_sync()
-        TokenAuth.create_table().run_sync()
+        create_db_tables_sync(BaseUser, TokenAuth)
 
     def tearDown(self):
-        TokenAuth.alter().drop_table().run_sync()
-        BaseUser.alter().drop_table().run_sync()
+        drop_db_tables_sync(BaseUser, TokenAuth)
 
     def test_login_success(self):
         user = BaseUser(**self.credentials)
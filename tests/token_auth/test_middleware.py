@@ -1,8 +1,8 @@
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import AsyncMock, patch
 
 from fastapi import FastAPI
 from piccolo.apps.user.tables import BaseUser
-from piccolo.utils.sync import run_sync
 from starlette.authentication import AuthenticationError
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.testclient import TestClient
@@ -13,6 +13,7 @@ from piccolo_api.token_auth.middleware import (
     TokenAuthBackend,
 )
 from piccolo_api.token_auth.tables import TokenAuth
+from tests.base import AsyncTruncatingTableTest
 
 fastapi_app = FastAPI(title="Test excluded paths")
 
@@ -45,49 +46,75 @@ APP_EXCLUDED_PATHS_WILDCARD = AuthenticationMiddleware(
 )
 
 
-class TestPiccoloToken(TestCase):
+@patch.object(BaseUser, "_pbkdf2_iteration_count", 1)
+class TestPiccoloToken(AsyncTruncatingTableTest):
+    tables = [BaseUser, TokenAuth]
     credentials = {"username": "Bob", "password": "bob123"}
 
-    def setUp(self):
-        BaseUser.create_table().run_sync()
-        TokenAuth.create_table().run_sync()
+    async def test_invalid_token_faliure(self):
+        provider = PiccoloTokenAuthProvider()
 
-    def tearDown(self):
-        TokenAuth.alter().drop_table().run_sync()
-        BaseUser.alter().drop_table().run_sync()
+        with self.assertRaises(AuthenticationError):
+            await provider.get_user("12345")
+
+    async def test_get_user_id_hook(self):
+        """
+        Make sure the token table's ``get_user_id`` is used, so subclasses can
+        customise how tokens are validated.
+        """
+        user = BaseUser(**self.credentials)
+        await user.save()
+        token = await TokenAuth.create_token(user_id=user.id)
 
-    def test_invalid_token_faliure(self):
         provider = PiccoloTokenAuthProvider()
 
-        with self.assertRaises(AuthenticationError):
-            run_sync(provider.get_user("12345"))
+        with patch.object(
+            TokenAuth, "get_user_id", AsyncMock(return_value=None)
+        ) as get_user_id:
+            with self.assertRaises(AuthenticationError):
+                await provider.get_user(token)
 
-    def test_sucess(self):
+        get_user_id.assert_awaited_once_with(token)
+
+    async def test_sucess(self):
         provider = PiccoloTokenAuthProvider()
 
         user = BaseUser(**self.credentials)
-        user.save().run_sync()
+        await user.save()
 
-        token = TokenAuth.create_token_sync(user_id=user.id)
+        token = await TokenAuth.create_token(user_id=user.id)
 
-        queried_user = run_sync(provider.get_user(token))
+        queried_user = await provider.get_user(token)
 
         self.assertEqual(user.username, queried_user.user["username"])
 
 
-class TestSecretTokenAuth(TestCase):
-    def test_get_user(self):
+class TestSecretTokenAuth(IsolatedAsyncioTestCase):
+    async def test_get_user(self):
         token = "12345"
         provider = SecretTokenAuthProvider(tokens=[token])
-        user = run_sync(provider.get_user(token))
+        user = await provider.get_user(token)
 
         self.assertEqual(user.username, "secret_token_user")
 
-    def test_get_user_failure(self):
+    async def test_get_user_multiple_tokens(self):
+        """
+        Make sure the token is recognised regardless of its position.
+        """
+        for tokens in (["aaaaa", "12345"], ["12345", "aaaaa"]):
+            provider = SecretTokenAuthProvider(tokens=tokens)
+            user = await provider.get_user("12345")
+            self.assertEqual(user.username, "secret_token_user")
+
+        provider = SecretTokenAuthProvider(tokens=["aaaaa", "12345"])
+        with self.assertRaises(AuthenticationError):
+            await provider.get_user("12346")
+
+    async def test_get_user_failure(self):
         provider = SecretTokenAuthProvider(tokens=[])
 
         with self.assertRaises(AuthenticationError):
-            run_sync(provider.get_user("12345"))
+            await provider.get_user("12345")
 
 
 class TestTokenAuth(TestCase):